@@ -1,9 +1,10 @@
 from django.contrib import admin
-from .models import Auction, Category, Bid, Rating, Comment
+from .models import Auction, Category, Bid, Rating, RatingSummary, Comment
 
 # Registro básico de todos los modelos para que sean gestionables desde el admin de Django
 admin.site.register(Auction)
 admin.site.register(Category)
 admin.site.register(Bid)
 admin.site.register(Rating)
-admin.site.register(Comment)
\ No newline at end of file
+admin.site.register(Comment)
+admin.site.register(RatingSummary)
\ No newline at end of file
@@ -0,0 +1,141 @@
+"""
+Variantes asincronas de los listados y detalles de solo lectura.
+
+Usan el ORM asincrono de Django (``acount``, ``aget``, ``async for``) y no
+ocupan un hilo por peticion bajo ASGI. Devuelven exactamente el mismo JSON que
+las vistas DRF equivalentes (mismos serializers, o sus versiones sobre filas de
+fast_serializers.py, y misma paginacion); todas las
+relaciones que serializan se cargan con select_related para que serializar no
+haga consultas (en contexto asincrono lanzarian SynchronousOnlyOperation).
+"""
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import APIException
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .fast_serializers import AuctionListRowSerializer, BidListRowSerializer, CommentListRowSerializer, RowSerializer
+from .filters import facet_counts, facet_queryset, filter_auctions, order_auctions, parse_bool, requested_ordering
+from .models import Auction, Bid, Comment, Rating
+from .search import search_auctions
+from .serializers import (
+    AuctionDetailSerializer,
+    RatingListCreateSerializer,
+    select_expansions,
+)
+
+
+def json_response(data, status=200):
+    # Mismo formato que JSONRenderer de DRF (compacto y sin escapar no-ASCII)
+    return JsonResponse(
+        data,
+        status=status,
+        safe=False,
+        encoder=JSONEncoder,
+        json_dumps_params={'ensure_ascii': False, 'separators': (',', ':')},
+    )
+
+
+def error_response(exc):
+    # Como exception_handler de DRF: los errores de validacion van tal cual
+    data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    return json_response(data, status=exc.status_code)
+
+
+class InvalidPage(APIException):
+    status_code = 404
+    default_detail = 'Invalid page.'
+
+
+async def paginate(request, queryset, serializer_class):
+    """Equivalente asincrono de PageNumberPagination (mismo sobre de respuesta)."""
+    page_size = api_settings.PAGE_SIZE
+    try:
+        page = int(request.GET.get('page', 1))
+    except ValueError:
+        raise InvalidPage()
+    count = await queryset.acount()
+    pages = max(1, -(-count // page_size))
+    if page < 1 or page > pages:
+        raise InvalidPage()
+
+    if issubclass(serializer_class, RowSerializer):
+        # Serializacion rapida sobre filas .values() (ver fast_serializers.py)
+        serializer = serializer_class(request)
+        queryset, serialize = serializer.values(queryset), serializer.serialize
+    else:
+        def serialize(rows):
+            return serializer_class(rows, many=True, context={'request': request}).data
+
+    offset = (page - 1) * page_size
+    rows = [obj async for obj in queryset[offset:offset + page_size]]
+    url = request.build_absolute_uri()
+    if page == 2:
+        previous = remove_query_param(url, 'page')
+    else:
+        previous = replace_query_param(url, 'page', page - 1) if page > 1 else None
+    return {
+        'count': count,
+        'next': replace_query_param(url, 'page', page + 1) if page < pages else None,
+        'previous': previous,
+        'results': serialize(rows),
+    }
+
+
+async def list_response(request, queryset, serializer_class):
+    try:
+        return json_response(await paginate(request, queryset, serializer_class))
+    except APIException as exc:
+        return error_response(exc)
+
+
+@require_GET
+async def auction_list(request):
+    try:
+        queryset = filter_auctions(select_expansions(Auction.objects.with_rating_stats(), request), request.GET)
+        ordering = requested_ordering(request.GET)
+    except APIException as exc:
+        return error_response(exc)
+    search, truncated = request.GET.get('search'), False
+    if search:
+        # El buscador en memoria puede tener que construirse (ORM sincrono)
+        queryset, truncated = await sync_to_async(search_auctions)(queryset, search)
+    queryset = order_auctions(queryset, ordering)
+    try:
+        data = await paginate(request, queryset, AuctionListRowSerializer)
+    except APIException as exc:
+        return error_response(exc)
+    if truncated:
+        data['search_truncated'] = True
+    if parse_bool(request.GET.get('facets')):
+        data['facets'] = facet_counts([row async for row in facet_queryset(queryset)])
+    return json_response(data)
+
+
+@require_GET
+async def auction_detail(request, pk):
+    try:
+        auction = await select_expansions(Auction.objects.with_rating_stats(), request).aget(pk=pk)
+    except Auction.DoesNotExist:
+        return json_response({'detail': 'No Auction matches the given query.'}, status=404)
+    return json_response(AuctionDetailSerializer(auction, context={'request': request}).data)
+
+
+@require_GET
+async def bid_list(request, auction_id):
+    queryset = Bid.objects.filter(auction_id=auction_id).select_related('bidder').order_by('-price')
+    return await list_response(request, queryset, BidListRowSerializer)
+
+
+@require_GET
+async def rating_list(request, auction_id):
+    queryset = Rating.objects.filter(auction_id=auction_id).select_related('user')
+    return await list_response(request, queryset, RatingListCreateSerializer)
+
+
+@require_GET
+async def comment_list(request, auction_id):
+    queryset = Comment.objects.filter(auction_id=auction_id).select_related('user')
+    return await list_response(request, queryset, CommentListRowSerializer)
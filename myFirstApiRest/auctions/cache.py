@@ -0,0 +1,80 @@
+"""
+Cache de respuestas de los listados publicos (usuarios anonimos).
+
+Cada listado depende de uno o varios "espacios" (``categories``, ``auctions``)
+con un contador de generacion en la cache. La clave de una respuesta incluye
+la ruta, los parametros de la peticion (pagina incluida) y esas generaciones;
+las escrituras suben la generacion (ver signals.py) y las claves antiguas
+dejan de usarse y caducan solas.
+
+Las respuestas solo se cachean con una cache compartida por todos los workers
+(Redis, Memcached...). Con LocMemCache cada proceso tendria sus propios
+contadores: una escritura en un worker no invalidaria las paginas cacheadas en
+los demas, que servirian datos obsoletos hasta API_CACHE_TIMEOUT.
+"""
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from rest_framework.response import Response
+
+GENERATION_KEY = 'api-cache-generation:{}'
+
+
+def get_cache():
+    return caches[getattr(settings, 'API_CACHE_ALIAS', 'default')]
+
+
+def is_shared_cache(cache):
+    # LocMemCache es de cada proceso (ver docstring del modulo)
+    return not isinstance(cache, LocMemCache)
+
+
+def get_generations(names):
+    cache = get_cache()
+    keys = [GENERATION_KEY.format(name) for name in names]
+    values = cache.get_many(keys)
+    return [values.get(key, 0) for key in keys]
+
+
+def bump_generation(name):
+    # Tras el commit: antes, otra peticion podria cachear datos sin confirmar
+    def bump():
+        cache = get_cache()
+        key = GENERATION_KEY.format(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+    transaction.on_commit(bump)
+
+
+class CachedListMixin:
+    """Sirve desde la cache compartida los GET anonimos del listado (``list``)."""
+    cache_generations = ()
+
+    def list(self, request, *args, **kwargs):
+        cache = get_cache()
+        if request.user.is_authenticated or not is_shared_cache(cache):
+            return super().list(request, *args, **kwargs)
+
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, getattr(settings, 'API_CACHE_TIMEOUT', 60))
+            response['X-Cache'] = 'MISS'
+        return response
+
+    def get_cache_key(self, request):
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        generations = get_generations(self.cache_generations)
+        raw = f"{request.path}?{query}|{generations}"
+        return 'api-cache:' + hashlib.md5(raw.encode()).hexdigest()
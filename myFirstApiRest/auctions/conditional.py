@@ -0,0 +1,49 @@
+"""
+GET condicionales (ETag / Last-Modified) para el detalle de una subasta y sus
+subrecursos (pujas, valoraciones, comentarios). Ambos se calculan con una
+consulta minima a la fila de la subasta, sin serializar nada: si el cliente ya
+tiene la version actual se responde 304 directamente.
+"""
+import hashlib
+
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from .models import Auction
+
+
+def _auction_state(request, auction_id):
+    # Se usa tanto para el ETag como para Last-Modified: una sola consulta
+    cache = request.__dict__.setdefault('_auction_state', {})
+    if auction_id not in cache:
+        cache[auction_id] = (
+            Auction.objects.filter(pk=auction_id)
+            .values_list('version', 'last_modified', 'closing_date')
+            .first()
+        )
+    return cache[auction_id]
+
+
+def auction_etag(request, pk=None, auction_id=None, **kwargs):
+    state = _auction_state(request, pk or auction_id)
+    if state is None:
+        return None
+    version, _, closing_date = state
+    # isOpen cambia con el tiempo sin que cambie la subasta
+    is_open = closing_date > timezone.now()
+    raw = f"{request.get_full_path()}|{request.META.get('HTTP_ACCEPT', '')}|{version}|{is_open}"
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def auction_last_modified(request, pk=None, auction_id=None, **kwargs):
+    state = _auction_state(request, pk or auction_id)
+    if state is None:
+        return None
+    _, last_modified, closing_date = state
+    # El cierre de la subasta tambien cuenta como modificacion
+    if closing_date <= timezone.now():
+        return max(last_modified, closing_date)
+    return last_modified
+
+
+auction_condition = condition(etag_func=auction_etag, last_modified_func=auction_last_modified)
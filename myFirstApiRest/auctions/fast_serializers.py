@@ -0,0 +1,201 @@
+"""
+Serializacion de solo lectura para los listados mas pedidos (subastas, pujas y
+comentarios), construida sobre filas ``.values()`` en lugar de instancias.
+
+La maquinaria de campos de DRF (``DateTimeField(format=...)``,
+``SerializerMethodField``, ``StringRelatedField``...) resuelve atributos,
+comprueba tipos y crea objetos por cada campo de cada fila. Aqui cada campo se
+compila una vez por peticion en una funcion ``fila -> valor`` con el formato ya
+resuelto (zona horaria, decimales), y el listado solo ejecuta esas funciones.
+
+La salida es la misma, byte a byte, que la de los serializers de
+serializers.py (lo comprueban los tests y ``benchmark_serializers``); la
+escritura y el detalle siguen usando DRF.
+"""
+import decimal
+from abc import ABC, abstractmethod
+
+from django.utils import timezone
+from rest_framework.response import Response
+from rest_framework.settings import ISO_8601, api_settings
+
+from .models import Auction, Bid, Comment
+from .serializers import (
+    AuctionListCreateSerializer, BidListCreateSerializer, CommentListCreateSerializer, requested_expansions,
+)
+
+# Formato de fecha de los serializers de serializers.py
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def datetime_converter(output_format=None):
+    # Como DateTimeField.to_representation: hora local y formato fijo o ISO 8601
+    output_format = output_format or api_settings.DATETIME_FORMAT
+    tz = timezone.get_current_timezone()
+    if output_format.lower() == ISO_8601:
+        def convert(value):
+            value = value.astimezone(tz).isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return convert
+    return lambda value: value.astimezone(tz).strftime(output_format)
+
+
+def decimal_converter(model, name):
+    # Como DecimalField.to_representation con COERCE_DECIMAL_TO_STRING
+    field = model._meta.get_field(name)
+    exponent = decimal.Decimal('.1') ** field.decimal_places
+    context = decimal.getcontext().copy()
+    context.prec = field.max_digits
+    return lambda value: '{:f}'.format(value.quantize(exponent, context=context))
+
+
+class RowSerializer(ABC):
+    """
+    Serializador de filas ``.values()``. ``get_fields`` devuelve, en el orden de
+    salida, tuplas (clave, campo de ``.values()``, conversor o None); los valores
+    None se devuelven tal cual, como hace Serializer.to_representation.
+    Para campos que dependen de varias columnas se usa ``row_fields``:
+    (clave, columnas necesarias, funcion ``fila -> valor``).
+    """
+
+    def __init__(self, request=None):
+        self.request = request
+        self.fields = self.get_fields()
+
+    @abstractmethod
+    def get_fields(self):
+        """Campos de salida de cada fila (ver docstring de la clase)."""
+
+    def values(self, queryset):
+        columns = []
+        for _, lookups, _ in self.fields:
+            for lookup in (lookups if isinstance(lookups, tuple) else (lookups,)):
+                if lookup not in columns:
+                    columns.append(lookup)
+        return queryset.values(*columns)
+
+    def compile(self):
+        getters = []
+        for key, lookup, convert in self.fields:
+            if isinstance(lookup, tuple):
+                getters.append((key, convert))
+            elif convert is None:
+                getters.append((key, lambda row, lookup=lookup: row[lookup]))
+            else:
+                getters.append((key, lambda row, lookup=lookup, convert=convert: (
+                    None if row[lookup] is None else convert(row[lookup])
+                )))
+        return getters
+
+    def serialize(self, rows):
+        getters = self.compile()
+        return [{key: getter(row) for key, getter in getters} for row in rows]
+
+
+class AuctionListRowSerializer(RowSerializer):
+    """Equivale a AuctionListCreateSerializer (incluido ?expand=auctioneer)."""
+
+    def get_fields(self):
+        now = timezone.now()
+        date = datetime_converter(DATE_FORMAT)
+        iso = datetime_converter()
+        money = decimal_converter(Auction, 'price')
+        if 'auctioneer' in requested_expansions(self.request):
+            auctioneer = ('auctioneer', ('auctioneer_id', 'auctioneer__username'), lambda row: {
+                'id': row['auctioneer_id'], 'username': row['auctioneer__username'],
+            })
+        else:
+            auctioneer = ('auctioneer', 'auctioneer_id', None)
+        return [
+            ('id', 'id', None),
+            ('creation_date', 'creation_date', date),
+            ('closing_date', 'closing_date', date),
+            ('isOpen', ('is_closed', 'closing_date'), lambda row: (
+                not row['is_closed'] and row['closing_date'] > now
+            )),
+            auctioneer,
+            ('average_rating', ('avg_rating',), lambda row: (
+                1.0 if row['avg_rating'] is None else round(row['avg_rating'], 2)
+            )),
+            ('title', 'title', None),
+            ('description', 'description', None),
+            ('price', 'price', money),
+            ('stock', 'stock', None),
+            ('brand', 'brand', None),
+            ('thumbnail', 'thumbnail', None),
+            ('highest_bid', 'highest_bid', decimal_converter(Auction, 'highest_bid')),
+            ('bid_count', 'bid_count', None),
+            ('version', 'version', None),
+            ('last_modified', 'last_modified', iso),
+            ('is_closed', 'is_closed', None),
+            ('closed_at', 'closed_at', iso),
+            ('category', 'category_id', None),
+            ('highest_bidder', 'highest_bidder_id', None),
+            ('winning_bid', 'winning_bid_id', None),
+        ]
+
+
+class BidListRowSerializer(RowSerializer):
+    """Equivale a BidListCreateSerializer."""
+
+    def get_fields(self):
+        return [
+            ('id', 'id', None),
+            ('auction', 'auction_id', None),
+            ('price', 'price', decimal_converter(Bid, 'price')),
+            ('creation_date', 'creation_date', datetime_converter(DATE_FORMAT)),
+            # StringRelatedField: str(usuario) es su username
+            ('bidder', 'bidder__username', None),
+        ]
+
+
+class CommentListRowSerializer(RowSerializer):
+    """Equivale a CommentListCreateSerializer."""
+
+    def get_fields(self):
+        date = datetime_converter(DATE_FORMAT)
+        return [
+            ('id', 'id', None),
+            ('title', 'title', None),
+            ('text', 'text', None),
+            ('creation_date', 'creation_date', date),
+            ('edit_date', 'edit_date', date),
+            ('auction', 'auction_id', None),
+            ('user', 'user__username', None),
+        ]
+
+
+class RowListMixin:
+    """Sirve el GET del listado con ``row_serializer_class`` sobre filas ``.values()``."""
+    row_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.row_serializer_class(request)
+        queryset = serializer.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(queryset))
+
+
+def comparison_cases():
+    """
+    (nombre, queryset, request, serializer DRF, serializer de filas) de cada
+    listado, para comprobar que la salida es identica (tests y benchmark_serializers).
+    """
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    factory = APIRequestFactory()
+    plain = Request(factory.get('/api/auctions/'))
+    expand = Request(factory.get('/api/auctions/?expand=auctioneer'))
+    auctions = Auction.objects.with_rating_stats().order_by('id')
+    return [
+        ("auctions", auctions, plain, AuctionListCreateSerializer, AuctionListRowSerializer),
+        ("auctions (expand)", auctions.select_related('auctioneer'), expand,
+         AuctionListCreateSerializer, AuctionListRowSerializer),
+        ("bids", Bid.objects.select_related('bidder').order_by('-price', '-id'), plain,
+         BidListCreateSerializer, BidListRowSerializer),
+        ("comments", Comment.objects.select_related('user').order_by('id'), plain,
+         CommentListCreateSerializer, CommentListRowSerializer),
+    ]
@@ -0,0 +1,154 @@
+"""
+Filtros, orden y facetas por parametros de consulta del listado de subastas,
+compartidos por la vista DRF y su variante asincrona.
+
+Filtros: ``category`` y ``brand`` (uno o varios separados por comas),
+``price_min``/``price_max`` (precio de salida), ``isOpen`` (u ``open``),
+``auctioneer`` y ``min_rating``. Orden: ``ordering=price,-bid_count`` con
+``price``, ``closing_date``, ``average_rating`` y ``bid_count``. Todos se
+traducen a condiciones sobre columnas indexadas (ver indices de Auction y
+RatingSummary). ``facets=true`` anade el numero de subastas por categoria y por
+marca del resultado filtrado, calculado con una sola consulta agrupada.
+"""
+import math
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Count, F, Q
+from rest_framework.exceptions import ValidationError
+
+TRUE_VALUES = {'true', '1', 'yes'}
+FALSE_VALUES = {'false', '0', 'no'}
+
+# Nombre publico -> expresion de orden ascendente y descendente
+ORDERING_FIELDS = {
+    'price': (F('price').asc(), F('price').desc()),
+    'closing_date': (F('closing_date').asc(), F('closing_date').desc()),
+    # Sin valoraciones se muestra 1.0 (la minima): primero en ascendente, ultimo en descendente
+    'average_rating': (
+        F('rating_summary__average').asc(nulls_first=True),
+        F('rating_summary__average').desc(nulls_last=True),
+    ),
+    'bid_count': (F('bid_count').asc(), F('bid_count').desc()),
+}
+
+
+def parse_bool(value):
+    """True/False para los valores reconocidos; None si falta o no se reconoce."""
+    if value is None:
+        return None
+    value = value.lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    return None
+
+
+# Mayor id que cabe en una columna bigint
+MAX_ID = 2 ** 63 - 1
+
+
+def _ids(params, name):
+    try:
+        ids = [int(value) for value in params[name].split(',') if value.strip()]
+    except ValueError:
+        ids = None
+    # Fuera de rango la BD falla (OverflowError en SQLite, DataError en Postgres)
+    if not ids or not all(0 < value <= MAX_ID for value in ids):
+        raise ValidationError({name: ["Se esperaba un id o una lista de ids separados por comas."]})
+    return ids
+
+
+def _number(params, name, cast=Decimal):
+    try:
+        value = cast(params[name])
+    except (InvalidOperation, ValueError):
+        raise ValidationError({name: ["Se esperaba un numero."]})
+    # NaN e Infinity se aceptan al convertir pero no se pueden comparar en SQL
+    if not (value.is_finite() if isinstance(value, Decimal) else math.isfinite(value)):
+        raise ValidationError({name: ["Se esperaba un numero finito."]})
+    return value
+
+
+def filter_open(queryset, value):
+    # ?open=true|false usando el estado persistido (indice auction_pending_close_idx)
+    is_open = parse_bool(value)
+    if is_open is None:
+        return queryset
+    return queryset.open() if is_open else queryset.closed()
+
+
+def filter_auctions(queryset, params):
+    """Aplica los filtros presentes en ``params`` (QueryDict) al queryset de subastas."""
+    if params.get('category'):
+        queryset = queryset.filter(category_id__in=_ids(params, 'category'))
+    if params.get('auctioneer'):
+        queryset = queryset.filter(auctioneer_id__in=_ids(params, 'auctioneer'))
+    if params.get('brand'):
+        queryset = queryset.filter(brand__in=[brand.strip() for brand in params['brand'].split(',')])
+    if params.get('price_min'):
+        queryset = queryset.filter(price__gte=_number(params, 'price_min'))
+    if params.get('price_max'):
+        queryset = queryset.filter(price__lte=_number(params, 'price_max'))
+    if params.get('min_rating'):
+        min_rating = _number(params, 'min_rating', float)
+        condition = Q(rating_summary__average__gte=min_rating)
+        if min_rating <= 1:
+            # Las subastas sin valoraciones cuentan como 1.0
+            condition |= Q(rating_summary__average__isnull=True)
+        queryset = queryset.filter(condition)
+    return filter_open(queryset, params.get('isOpen', params.get('open')))
+
+
+def requested_ordering(params):
+    """Nombres de orden pedidos (``-`` para descendente); lista vacia si no hay."""
+    names = [name.strip() for name in params.get('ordering', '').split(',') if name.strip()]
+    unknown = [name for name in names if name.lstrip('-') not in ORDERING_FIELDS]
+    if unknown:
+        raise ValidationError({'ordering': [f"Campos no permitidos: {', '.join(unknown)}."]})
+    return names
+
+
+def order_auctions(queryset, names):
+    if not names:
+        return queryset
+    expressions = [ORDERING_FIELDS[name.lstrip('-')][name.startswith('-')] for name in names]
+    # id como desempate: orden total y estable entre paginas
+    return queryset.order_by(*expressions, '-id' if names[0].startswith('-') else 'id')
+
+
+def facet_queryset(queryset):
+    # Una fila por (categoria, marca): de ahi salen las dos facetas
+    return (
+        queryset.order_by()
+        .values('category_id', 'category__name', 'brand')
+        .annotate(count=Count('id'))
+    )
+
+
+def facet_counts(rows):
+    categories, brands = {}, {}
+    for row in rows:
+        category = categories.setdefault(
+            row['category_id'], {'id': row['category_id'], 'name': row['category__name'], 'count': 0}
+        )
+        category['count'] += row['count']
+        brands[row['brand']] = brands.get(row['brand'], 0) + row['count']
+    return {
+        'category': sorted(categories.values(), key=lambda item: (-item['count'], item['id'])),
+        'brand': [
+            {'brand': brand, 'count': count}
+            for brand, count in sorted(brands.items(), key=lambda item: (-item[1], item[0]))
+        ],
+    }
+
+
+class FacetedListMixin:
+    """Con ``?facets=true`` anade ``facets`` a la respuesta paginada del listado."""
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if parse_bool(request.query_params.get('facets')) and isinstance(response.data, dict):
+            rows = facet_queryset(self.filter_queryset(self.get_queryset()))
+            response.data['facets'] = facet_counts(rows)
+        return response
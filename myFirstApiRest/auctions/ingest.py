@@ -0,0 +1,206 @@
+"""
+Ingesta masiva de pujas, valoraciones y comentarios (importaciones de
+historico e integraciones de socios, solo administradores).
+
+Cada peticion es una lista de registros con la subasta y el usuario en nombre
+del que se crean::
+
+    [{"auction": 1, "bidder": 7, "price": "120.00"}, ...]   # pujas
+    [{"auction": 1, "user": 7, "value": 4}, ...]             # valoraciones
+    [{"auction": 1, "user": 7, "title": "...", "text": "..."}, ...]
+
+Los campos propios se validan con los serializers de siempre; subastas y
+usuarios se resuelven con un ``in_bulk`` cada uno y las filas se insertan con
+``bulk_create``. Como bulk_create no lanza signals, aqui se mantienen a mano
+los datos desnormalizados (puja mas alta, resumen de valoraciones, version de
+la subasta) y la cache de listados. Los registros invalidos no se insertan y
+el resultado indica, por posicion, el id creado o los errores.
+
+Al ser historico no se aplica la puja minima de las subastas en vivo: solo
+las restricciones de datos (una puja, valoracion y comentario por usuario y
+subasta) y, para las pujas, que la subasta siga abierta.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import as_serializer_error
+
+from users.models import CustomUser
+from .cache import bump_generation
+from .filters import MAX_ID
+from .models import Auction, Bid, Comment, Rating, RatingSummary
+from .serializers import BidListCreateSerializer, CommentListCreateSerializer, RatingListCreateSerializer
+from .services import BID_STATS_FIELDS, touch_auctions
+
+
+class BulkIngest:
+    model = None
+    serializer_class = None
+    user_field = 'user'
+    # Espacios de la cache de listados afectados (ver signals.py)
+    cache_generations = ()
+
+    def __init__(self, items):
+        max_items = getattr(settings, 'BULK_INGEST_MAX_ITEMS', 5000)
+        if not isinstance(items, list) or not items:
+            raise ValidationError({"detail": "Se esperaba una lista de registros."})
+        if len(items) > max_items:
+            raise ValidationError({"detail": f"Como maximo {max_items} registros por peticion."})
+        self.items = items
+        self.results = [None] * len(items)
+
+    def run(self):
+        """Devuelve (resultados por posicion, numero de filas creadas)."""
+        pending = self._validate()
+        with transaction.atomic():
+            # Bloquea las subastas: serializa la ingesta con place_bid y con otras ingestas
+            auctions = Auction.objects.select_for_update().in_bulk({row[1] for row in pending})
+            users = CustomUser.objects.in_bulk({row[2] for row in pending})
+            taken = self._existing_pairs(pending)
+
+            objects = []
+            for index, auction_id, user_id, data in pending:
+                if auction_id not in auctions:
+                    self._error(index, {"auction": ["Subasta no encontrada."]})
+                elif user_id not in users:
+                    self._error(index, {self.user_field: ["Usuario no encontrado."]})
+                elif errors := self.check_auction(auctions[auction_id]):
+                    self._error(index, errors)
+                elif (auction_id, user_id) in taken:
+                    self._error(index, {self.user_field: ["Ya existe un registro de este usuario en la subasta."]})
+                else:
+                    taken.add((auction_id, user_id))
+                    objects.append((index, self.model(auction_id=auction_id, **{f'{self.user_field}_id': user_id}, **data)))
+
+            self.model.objects.bulk_create([obj for _, obj in objects], batch_size=1000)
+            for index, obj in objects:
+                self.results[index] = {"index": index, "id": obj.pk}
+            if objects:
+                self.after_insert([obj for _, obj in objects], auctions)
+                for name in self.cache_generations:
+                    bump_generation(name)
+        return self.results, len(objects)
+
+    def after_insert(self, objects, auctions):
+        touch_auctions({obj.auction_id for obj in objects})
+
+    def clean(self, data):
+        """Validacion adicional de los datos ya validados por el serializer: dict de errores."""
+        return {}
+
+    def check_auction(self, auction):
+        """Errores (dict) si no se pueden anadir registros a la subasta (ya bloqueada)."""
+        return {}
+
+    def _validate(self):
+        pending = []
+        # Una sola instancia para todos los registros, como hace ListSerializer:
+        # construir los campos del serializer por registro es lo mas caro
+        serializer = self.serializer_class()
+        for index, item in enumerate(self.items):
+            if not isinstance(item, dict):
+                self._error(index, {"non_field_errors": ["Se esperaba un objeto."]})
+                continue
+            fields = {key: value for key, value in item.items() if key not in ('auction', self.user_field)}
+            ids, errors = {}, {}
+            for key in ('auction', self.user_field):
+                try:
+                    ids[key] = int(item[key])
+                except KeyError:
+                    errors[key] = ["Este campo es requerido."]
+                except (TypeError, ValueError):
+                    errors[key] = ["Se esperaba un id numerico."]
+                else:
+                    # Fuera de rango la consulta de in_bulk fallaria para todo el lote
+                    if not 0 < ids[key] <= MAX_ID:
+                        errors[key] = ["Id fuera de rango."]
+            try:
+                data = serializer.run_validation(fields)
+            except ValidationError as exc:
+                errors.update(as_serializer_error(exc))
+            else:
+                errors.update(self.clean(data))
+            if errors:
+                self._error(index, errors)
+            else:
+                pending.append((index, ids['auction'], ids[self.user_field], dict(data)))
+        return pending
+
+    def _existing_pairs(self, pending):
+        user_column = f'{self.user_field}_id'
+        return set(
+            self.model.objects.filter(
+                auction_id__in={row[1] for row in pending},
+                **{f'{user_column}__in': {row[2] for row in pending}},
+            ).values_list('auction_id', user_column)
+        )
+
+    def _error(self, index, errors):
+        self.results[index] = {"index": index, "errors": errors}
+
+
+class BidIngest(BulkIngest):
+    model = Bid
+    serializer_class = BidListCreateSerializer
+    user_field = 'bidder'
+    cache_generations = ('auctions',)
+
+    def clean(self, data):
+        if data['price'] <= 0:
+            return {"price": ["La puja debe ser mayor que cero."]}
+        return {}
+
+    def check_auction(self, auction):
+        # Como place_bid: cerrada en BD o con la fecha de cierre ya pasada
+        if not auction.is_open:
+            return {"auction": ["La subasta esta cerrada."]}
+        return {}
+
+    def after_insert(self, bids, auctions):
+        # Mismo resultado que record_new_bid para cada puja, con un solo UPDATE por lote
+        now = timezone.now()
+        changed = {}
+        for bid in bids:
+            auction = changed.setdefault(bid.auction_id, auctions[bid.auction_id])
+            auction.bid_count += 1
+            if auction.highest_bid is None or bid.price > auction.highest_bid:
+                auction.highest_bid = bid.price
+                auction.highest_bidder_id = bid.bidder_id
+        for auction in changed.values():
+            auction.version += 1
+            auction.last_modified = now
+        Auction.objects.bulk_update(changed.values(), [*BID_STATS_FIELDS, 'version', 'last_modified'])
+
+
+class RatingIngest(BulkIngest):
+    model = Rating
+    serializer_class = RatingListCreateSerializer
+    cache_generations = ('auctions',)
+
+    def after_insert(self, ratings, auctions):
+        deltas = {}
+        for rating in ratings:
+            count, total = deltas.get(rating.auction_id, (0, 0))
+            deltas[rating.auction_id] = (count + 1, total + rating.value)
+
+        summaries = RatingSummary.objects.select_for_update().in_bulk(deltas)
+        created = []
+        for auction_id, (count, total) in deltas.items():
+            summary = summaries.get(auction_id)
+            if summary is None:
+                summary = RatingSummary(auction_id=auction_id)
+                created.append(summary)
+            summary.count += count
+            summary.total += total
+            summary.average = summary.total / summary.count
+        RatingSummary.objects.bulk_update(
+            [summary for summary in summaries.values()], ['count', 'total', 'average']
+        )
+        RatingSummary.objects.bulk_create(created)
+        super().after_insert(ratings, auctions)
+
+
+class CommentIngest(BulkIngest):
+    model = Comment
+    serializer_class = CommentListCreateSerializer
@@ -0,0 +1,250 @@
+import json
+import platform
+import statistics
+import time
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from auctions.management.databases import scratch_database
+from auctions.models import Auction
+from auctions.seeding import seed_dataset
+from users.models import CustomUser
+
+# Metricas comparadas con la linea base: (clave, True si mas alto es mejor)
+COMPARED = (('throughput', True), ('p50_ms', False), ('p99_ms', False))
+
+
+class Command(BaseCommand):
+    help = (
+        "Crea una base de datos de pruebas (como manage.py test), siembra un juego "
+        "de datos, pide cada ruta de auctions/urls.py y users/urls.py con el "
+        "cliente de Django y mide throughput y latencia p50/p99. Guarda el "
+        "resultado en JSON y, con --baseline, marca las regresiones. La base de "
+        "datos se destruye al terminar: nunca escribe en la de DATABASE_URL. Se "
+        "omiten change-password y log-out, que invalidan las credenciales del usuario."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--auctions', type=int, default=2000)
+        parser.add_argument('--bids', type=int, default=10, help="Pujas por subasta.")
+        parser.add_argument('--ratings', type=int, default=5, help="Valoraciones por subasta.")
+        parser.add_argument('--comments', type=int, default=3, help="Comentarios por subasta.")
+        parser.add_argument('--requests', type=int, default=50, help="Peticiones medidas por ruta.")
+        parser.add_argument('--warmup', type=int, default=5, help="Peticiones previas sin medir por ruta.")
+        parser.add_argument('--routes', nargs='*', help="Solo las rutas cuyo nombre contenga alguno de estos textos.")
+        parser.add_argument('--cache', action='store_true', help="Mantener la cache de listados publicos.")
+        parser.add_argument('--output', default='benchmark_api.json', help="Fichero JSON de resultados.")
+        parser.add_argument('--baseline', help="JSON de una ejecucion anterior con el que comparar.")
+        parser.add_argument('--threshold', type=float, default=20.0, help="Empeoramiento (%%) que cuenta como regresion.")
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        overrides = {'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver']}
+        if not options['cache']:
+            # Sin cache se mide el trabajo real de la vista, no un acierto de cache
+            overrides['CACHES'] = {
+                **settings.CACHES, 'benchmark': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+            }
+            overrides['API_CACHE_ALIAS'] = 'benchmark'
+
+        # Miles de filas y escrituras con select_for_update: solo en una base de datos desechable
+        with scratch_database(), override_settings(**overrides), transaction.atomic():
+            started = time.perf_counter()
+            data = seed_dataset(
+                users=options['users'],
+                categories=options['categories'],
+                auctions=options['auctions'],
+                bids_per_auction=options['bids'],
+                ratings_per_auction=options['ratings'],
+                comments_per_auction=options['comments'],
+                seed=options['seed'],
+            )
+            self.stdout.write(f"Seeded dataset in {time.perf_counter() - started:.1f} s")
+            scenarios = self._scenarios(data, options)
+            results = {}
+            for name, method, build, token, expected in scenarios:
+                if options['routes'] and not any(part in name for part in options['routes']):
+                    continue
+                results[name] = self._measure(method, build, token, expected, options)
+                self.stdout.write(self._format(name, results[name]))
+            transaction.set_rollback(True)
+
+        report = {'meta': self._meta(options), 'results': results}
+        with open(options['output'], 'w') as file:
+            json.dump(report, file, indent=2)
+        self.stdout.write(f"Results written to {options['output']}")
+
+        if options['baseline']:
+            self._compare(report, options['baseline'], options['threshold'])
+
+    def _scenarios(self, data, options):
+        now = timezone.now()
+        users = data['users']
+        auction = next((a for a in data['auctions'] if a.closing_date > now + timedelta(hours=1)), data['auctions'][0])
+        bidder = next(bid.bidder for bid in data['bids'] if bid.auction_id == auction.pk)
+        # Cada escritura la hace un usuario distinto: solo se puede pujar, valorar
+        # y comentar una vez por subasta
+        writers = self._writers(options['warmup'] + options['requests'])
+        admin = writers[0]
+        admin.is_staff = True
+        admin.save(update_fields=['is_staff'])
+        if auction.closing_date <= now + timedelta(hours=1):
+            Auction.objects.filter(pk=auction.pk).update(closing_date=now + timedelta(days=7))
+        start_price = max(auction.price, auction.highest_bid or 0) + 1
+
+        def token(user):
+            return f'Bearer {AccessToken.for_user(user)}'
+
+        def fixed(path, body=None):
+            return lambda i: (path, body)
+
+        # Pagina a mitad del listado: el coste del OFFSET crece con la profundidad
+        deep_page = max(1, len(data['auctions']) // settings.REST_FRAMEWORK['PAGE_SIZE'] // 2)
+        user_ids = ','.join(str(user.pk) for user in users[:50])
+        a = f'/api/auctions/{auction.pk}'
+        # (nombre de la URL, metodo, fn(i) -> (ruta, cuerpo), Authorization, codigo esperado)
+        return [
+            ('category-list-create', 'GET', fixed('/api/auctions/categories/'), None, 200),
+            ('category-detail', 'GET', fixed(f'/api/auctions/categories/{auction.category_id}/'), None, 200),
+            ('auction-list-create', 'GET', fixed('/api/auctions/'), None, 200),
+            ('auction-list-create (deep page)', 'GET', fixed(f'/api/auctions/?page={deep_page}'), None, 200),
+            ('auction-list-create (cursor)', 'GET', fixed('/api/auctions/?pagination=cursor'), None, 200),
+            ('auction-list-create (search)', 'GET', fixed('/api/auctions/?search=jamon%20lote%201'), None, 200),
+            ('auction-list-create (expand)', 'GET', fixed('/api/auctions/?expand=auctioneer'), None, 200),
+            ('auction-list-create (filters)', 'GET',
+             fixed('/api/auctions/?isOpen=true&price_min=20&ordering=-bid_count&facets=true'), None, 200),
+            ('auction-list-create POST', 'POST', lambda i: ('/api/auctions/', {
+                'title': f'Benchmark {i}', 'description': 'Pieza de prueba', 'price': '10.00', 'stock': 1,
+                'brand': 'Joselito', 'category': auction.category_id, 'thumbnail': 'https://example.com/b.png',
+                'closing_date': (now + timedelta(days=30)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            }), token(auction.auctioneer), 201),
+            ('auction-detail', 'GET', fixed(f'{a}/'), None, 200),
+            ('bid-list-create', 'GET', fixed(f'{a}/bids/'), None, 200),
+            ('bid-list-create POST', 'POST', lambda i: (f'{a}/bids/', {'price': str(start_price + i)}),
+             [token(user) for user in writers], 201),
+            ('bid-retrieve-update-destroy', 'GET', fixed(f'{a}/my_bid/'), token(bidder), 200),
+            ('action-from-users', 'GET', fixed('/api/auctions/user_auctions/'), token(auction.auctioneer), 200),
+            ('bid-from-users', 'GET', fixed('/api/auctions/user_bids/'), token(bidder), 200),
+            ('rating-list-create', 'GET', fixed(f'{a}/ratings/'), None, 200),
+            ('rating-list-create POST', 'POST', lambda i: (f'{a}/ratings/', {'value': i % 5 + 1}),
+             [token(user) for user in writers], 201),
+            ('my-rating-auction', 'GET', fixed(f'{a}/my_rating/'), token(bidder), 200),
+            ('comment-list-create', 'GET', fixed(f'{a}/comments/'), None, 200),
+            ('comment-list-create POST', 'POST', lambda i: (f'{a}/comments/', {'title': 'Opinión', 'text': f'Comentario {i}'}),
+             [token(user) for user in writers], 201),
+            ('my-comment-auction', 'GET', fixed(f'{a}/my_comment/'), token(bidder), 200),
+            ('async-auction-list', 'GET', fixed('/api/auctions/async/'), None, 200),
+            ('async-auction-detail', 'GET', fixed(f'/api/auctions/async/{auction.pk}/'), None, 200),
+            ('async-bid-list', 'GET', fixed(f'/api/auctions/async/{auction.pk}/bids/'), None, 200),
+            ('async-rating-list', 'GET', fixed(f'/api/auctions/async/{auction.pk}/ratings/'), None, 200),
+            ('async-comment-list', 'GET', fixed(f'/api/auctions/async/{auction.pk}/comments/'), None, 200),
+            ('user-register', 'POST', lambda i: ('/api/users/register/', {
+                'username': f'benchmark-register-{i}', 'email': f'benchmark-{i}@example.com',
+                'password': 'benchmark-1234', 'birth_date': '1990-01-01',
+            }), None, 201),
+            ('user-list', 'GET', fixed('/api/users/'), token(admin), 200),
+            ('user-detail', 'GET', fixed(f'/api/users/{bidder.pk}/'), token(admin), 200),
+            ('user-profile', 'GET', fixed('/api/users/profile/'), token(bidder), 200),
+            ('get-username-by-id', 'GET', fixed(f'/api/users/{bidder.pk}/username/'), token(bidder), 200),
+            ('get-usernames-by-ids', 'GET', fixed(f'/api/users/usernames/?ids={user_ids}'), token(bidder), 200),
+            ('async-get-username-by-id', 'GET', fixed(f'/api/users/async/{bidder.pk}/username/'), token(bidder), 200),
+        ]
+
+    def _writers(self, count):
+        password = make_password(None)
+        return CustomUser.objects.bulk_create([
+            CustomUser(username=f'benchmark-writer-{i}', password=password, birth_date='1990-01-01')
+            for i in range(count)
+        ])
+
+    def _measure(self, method, build, token, expected, options):
+        client = Client()
+        timings, errors, first_error = [], 0, None
+        total = options['warmup'] + options['requests']
+        for i in range(total):
+            path, body = build(i)
+            headers = {}
+            auth = token[i] if isinstance(token, list) else token
+            if auth:
+                headers['Authorization'] = auth
+            start = time.perf_counter()
+            if method == 'GET':
+                response = client.get(path, headers=headers)
+            else:
+                response = client.generic(method, path, json.dumps(body), 'application/json', headers=headers)
+            response.content
+            elapsed = time.perf_counter() - start
+            if i < options['warmup']:
+                continue
+            timings.append(elapsed)
+            if response.status_code != expected:
+                errors += 1
+                first_error = first_error or f"{response.status_code} {response.content[:200].decode(errors='replace')}"
+
+        timings.sort()
+        return {
+            'requests': len(timings),
+            'errors': errors,
+            'throughput': round(len(timings) / sum(timings), 2),
+            'mean_ms': round(statistics.fmean(timings) * 1000, 3),
+            'p50_ms': round(timings[len(timings) // 2] * 1000, 3),
+            'p99_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1000, 3),
+            'first_error': first_error,
+        }
+
+    def _format(self, name, result):
+        line = (
+            f"{name:<32} {result['throughput']:9.1f} req/s   "
+            f"p50 {result['p50_ms']:8.2f} ms   p99 {result['p99_ms']:8.2f} ms"
+        )
+        if result['errors']:
+            return self.style.ERROR(f"{line}   {result['errors']} unexpected responses ({result['first_error']})")
+        return line
+
+    def _meta(self, options):
+        return {
+            'date': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'cache': options['cache'],
+            'dataset': {key: options[key] for key in ('users', 'categories', 'auctions', 'bids', 'ratings', 'comments')},
+            'requests': options['requests'],
+        }
+
+    def _compare(self, report, path, threshold):
+        with open(path) as file:
+            baseline = json.load(file)
+        if baseline['meta']['dataset'] != report['meta']['dataset']:
+            self.stdout.write(self.style.WARNING("Baseline was run with a different dataset."))
+
+        regressions = []
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Compared with {path} (threshold {threshold:.0f}%)"))
+        for name, result in report['results'].items():
+            before = baseline['results'].get(name)
+            if before is None:
+                continue
+            changes, regressed = [], False
+            for key, higher_is_better in COMPARED:
+                change = (result[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+                changes.append(f"{key} {change:+6.1f}%")
+                if (-change if higher_is_better else change) > threshold:
+                    regressions.append(f"{name} {key}")
+                    regressed = True
+            line = f"{name:<32} " + "   ".join(changes)
+            self.stdout.write(self.style.ERROR(line) if regressed else line)
+
+        if regressions:
+            raise CommandError("Performance regressions: " + ", ".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+
+
+def summary(label, timings, elapsed):
+    timings = sorted(timings)
+    return (
+        f"{label:<34} {len(timings) / elapsed:8.1f} req/s   "
+        f"p50 {timings[len(timings) // 2] * 1000:8.1f} ms   "
+        f"p99 {timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1000:8.1f} ms"
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el throughput de una vista DRF sincrona servida por un pool de hilos "
+        "(como gunicorn con --threads) con su variante asincrona en un event loop (ASGI), "
+        "con muchos clientes lentos concurrentes. Cada cliente mantiene ocupada la "
+        "peticion --client-delay segundos tras la respuesta (red lenta): en WSGI bloquea "
+        "un hilo, en ASGI solo una corrutina."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sync-url', default='/api/auctions/')
+        parser.add_argument('--async-url', default='/api/auctions/async/')
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=50, help="Clientes concurrentes.")
+        parser.add_argument('--threads', type=int, default=4, help="Hilos del servidor WSGI.")
+        parser.add_argument('--client-delay', type=float, default=0.1, help="Segundos que tarda cada cliente.")
+
+    def handle(self, *args, **options):
+        # Los clientes de test usan el host "testserver". Sin cache de listados: la
+        # vista sincrona serviria aciertos de cache y la asincrona siempre consulta
+        caches = {**settings.CACHES, 'benchmark': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            CACHES=caches,
+            API_CACHE_ALIAS='benchmark',
+        ):
+            wsgi = self._run_threads(options)
+            asgi = asyncio.run(self._run_async(options))
+
+        self.stdout.write(
+            f"{options['requests']} requests, {options['concurrency']} concurrent clients, "
+            f"{options['client_delay'] * 1000:.0f} ms per client"
+        )
+        self.stdout.write(summary(f"WSGI ({options['threads']} threads)", *wsgi))
+        self.stdout.write(summary("ASGI (async views)", *asgi))
+
+    def _run_threads(self, options):
+        local = threading.local()
+        slots = threading.BoundedSemaphore(options['concurrency'])
+
+        def request(queued):
+            if not hasattr(local, 'client'):
+                local.client = Client()
+            try:
+                response = local.client.get(options['sync_url'])
+                response.content
+                time.sleep(options['client_delay'])
+            finally:
+                close_old_connections()
+                slots.release()
+            return time.perf_counter() - queued
+
+        began = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            futures = []
+            for _ in range(options['requests']):
+                # Como mucho --concurrency clientes esperando o siendo atendidos
+                slots.acquire()
+                futures.append(pool.submit(request, time.perf_counter()))
+            timings = [future.result() for future in futures]
+        return timings, time.perf_counter() - began
+
+    async def _run_async(self, options):
+        client = AsyncClient()
+        slots = asyncio.Semaphore(options['concurrency'])
+
+        async def request():
+            async with slots:
+                queued = time.perf_counter()
+                response = await client.get(options['async_url'])
+                response.content
+                await asyncio.sleep(options['client_delay'])
+                return time.perf_counter() - queued
+
+        began = time.perf_counter()
+        timings = await asyncio.gather(*(request() for _ in range(options['requests'])))
+        return timings, time.perf_counter() - began
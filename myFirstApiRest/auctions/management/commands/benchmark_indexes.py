@@ -0,0 +1,97 @@
+import statistics
+import time
+from importlib import import_module
+
+from django.core.management.base import BaseCommand
+from django.db import connection, migrations, transaction
+from django.utils import timezone
+
+from auctions.management.databases import scratch_database
+from auctions.models import Auction, Bid, Comment, Rating
+from auctions.seeding import seed_dataset
+
+# Solo se comparan los indices de esta migracion
+INDEX_MIGRATION = 'auctions.migrations.0006_hot_path_indexes'
+
+
+class Command(BaseCommand):
+    help = (
+        "Crea una base de datos de pruebas (como manage.py test), siembra un juego de "
+        "datos, muestra el plan y el tiempo de las consultas calientes con y sin los "
+        "indices de la migracion 0006 y destruye la base de datos al terminar. Nunca "
+        "toca la base de datos configurada en DATABASE_URL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=500)
+        parser.add_argument('--auctions', type=int, default=5000)
+        parser.add_argument('--bids', type=int, default=20, help="Pujas por subasta.")
+        parser.add_argument('--repeat', type=int, default=20, help="Repeticiones por consulta.")
+
+    def handle(self, *args, **options):
+        # DROP INDEX bloquea la tabla entera: solo en una base de datos desechable
+        with scratch_database():
+            self._run(options)
+
+    def _run(self, options):
+        with transaction.atomic():
+            data = seed_dataset(
+                users=options['users'],
+                auctions=options['auctions'],
+                bids_per_auction=options['bids'],
+                seed=0,
+            )
+            self._analyze()
+            queries = self._queries(data)
+
+            after = self._measure(queries, options['repeat'])
+            with connection.cursor() as cursor:
+                for name in self._index_names():
+                    cursor.execute(f"DROP INDEX {connection.ops.quote_name(name)}")
+            self._analyze()
+            before = self._measure(queries, options['repeat'])
+
+            for label in queries:
+                self.stdout.write(self.style.MIGRATE_HEADING(label))
+                self.stdout.write("  without indexes: %.3f ms" % before[label][0])
+                self.stdout.write(self._indent(before[label][1]))
+                self.stdout.write("  with indexes:    %.3f ms" % after[label][0])
+                self.stdout.write(self._indent(after[label][1]))
+
+            transaction.set_rollback(True)
+
+    def _queries(self, data):
+        now = timezone.now()
+        auction = data['auctions'][len(data['auctions']) // 2]
+        return {
+            "bids of an auction by price": lambda: Bid.objects.filter(auction_id=auction.pk).order_by('-price')[:5],
+            "open auctions": lambda: Auction.objects.filter(closing_date__gt=now).order_by('closing_date')[:5],
+            "open auctions of a category": lambda: Auction.objects.filter(
+                category_id=auction.category_id, closing_date__gt=now
+            )[:5],
+            "auctions of a user": lambda: Auction.objects.filter(auctioneer_id=auction.auctioneer_id).order_by('id'),
+            "ratings of an auction": lambda: Rating.objects.filter(auction_id=auction.pk)[:5],
+            "comments of an auction": lambda: Comment.objects.filter(auction_id=auction.pk)[:5],
+        }
+
+    def _measure(self, queries, repeat):
+        results = {}
+        for label, build in queries.items():
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                list(build())
+                timings.append((time.perf_counter() - start) * 1000)
+            results[label] = (statistics.median(timings), build().explain())
+        return results
+
+    def _index_names(self):
+        operations = import_module(INDEX_MIGRATION).Migration.operations
+        return [operation.index.name for operation in operations if isinstance(operation, migrations.AddIndex)]
+
+    def _analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def _indent(self, plan):
+        return "\n".join("    " + line for line in plan.splitlines())
@@ -0,0 +1,66 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from auctions.fast_serializers import comparison_cases
+from auctions.management.databases import scratch_database
+from auctions.seeding import seed_dataset
+
+
+def best_of(repeat, function):
+    timings = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - began)
+    return min(timings), result
+
+
+class Command(BaseCommand):
+    help = (
+        "Microbenchmark de los listados de solo lectura: serializers DRF sobre "
+        "instancias frente a fast_serializers sobre filas .values(). Mide filas/s "
+        "de la consulta mas la serializacion (mejor de --repeat) y comprueba que el "
+        "JSON es identico byte a byte. Siembra los datos en una base de datos de "
+        "pruebas (como manage.py test) que se destruye al terminar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--auctions', type=int, default=1000)
+        parser.add_argument('--bids', type=int, default=10, help="Pujas por subasta.")
+        parser.add_argument('--comments', type=int, default=3, help="Comentarios por subasta.")
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        # Miles de filas sembradas: solo en una base de datos desechable
+        with scratch_database():
+            seed_dataset(
+                auctions=options['auctions'], bids_per_auction=options['bids'],
+                comments_per_auction=options['comments'], seed=options['seed'],
+            )
+            self._run(options)
+
+    def _run(self, options):
+        renderer = JSONRenderer()
+        self.stdout.write(f"{'list':<20} {'rows':>8} {'DRF rows/s':>14} {'fast rows/s':>14} {'speedup':>8}")
+        for label, queryset, request, drf_class, row_class in comparison_cases():
+            drf_time, drf_data = best_of(options['repeat'], lambda: drf_class(
+                list(queryset), many=True, context={'request': request}
+            ).data)
+
+            def fast():
+                serializer = row_class(request)
+                return serializer.serialize(list(serializer.values(queryset)))
+
+            fast_time, fast_data = best_of(options['repeat'], fast)
+            if renderer.render(drf_data) != renderer.render(fast_data):
+                raise CommandError(f"{label}: output differs from the DRF serializer.")
+
+            rows = len(drf_data)
+            self.stdout.write(
+                f"{label:<20} {rows:>8} {rows / drf_time:>14,.0f} {rows / fast_time:>14,.0f} "
+                f"{drf_time / fast_time:>7.1f}x"
+            )
+        self.stdout.write(self.style.SUCCESS("Output is byte-identical for every list."))
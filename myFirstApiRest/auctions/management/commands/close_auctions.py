@@ -0,0 +1,74 @@
+import heapq
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from auctions.models import Auction
+from auctions.services import close_auction, close_due_auctions
+
+
+class Command(BaseCommand):
+    help = (
+        "Cierra las subastas vencidas y guarda su puja ganadora. Sin opciones procesa "
+        "las pendientes y termina (para cron); con --loop se queda en marcha con una "
+        "cola ordenada por fecha de cierre de las proximas subastas y cierra cada una "
+        "en cuanto vence."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Trabajar de forma continua.")
+        parser.add_argument('--horizon', type=int, default=300,
+                            help="Segundos por delante que se cargan en la cola.")
+        parser.add_argument('--refresh', type=int, default=30,
+                            help="Segundos entre recargas de la cola (subastas nuevas o cambiadas).")
+
+    def handle(self, *args, **options):
+        closed = close_due_auctions()
+        self._report(closed)
+        if options['loop']:
+            self._loop(options['horizon'], options['refresh'])
+
+    def _loop(self, horizon, refresh):
+        queue = []
+        next_refresh = 0.0
+        while True:
+            if time.monotonic() >= next_refresh:
+                # Recarga completa: recoge subastas nuevas y fechas de cierre cambiadas
+                # (close_auction vuelve a comprobar la fecha con la fila bloqueada)
+                close_old_connections()
+                queue = self._upcoming(horizon)
+                next_refresh = time.monotonic() + refresh
+                self._report(close_due_auctions())
+
+            now = timezone.now()
+            closed = []
+            while queue and queue[0][0] <= now:
+                _, auction_id = heapq.heappop(queue)
+                auction = close_auction(auction_id, now)
+                if auction is not None:
+                    closed.append(auction)
+            self._report(closed)
+
+            wait = next_refresh - time.monotonic()
+            if queue:
+                wait = min(wait, (queue[0][0] - timezone.now()).total_seconds())
+            time.sleep(max(0.05, wait))
+
+    def _upcoming(self, horizon):
+        limit = timezone.now() + timedelta(seconds=horizon)
+        queue = list(
+            Auction.objects.filter(is_closed=False, closing_date__lte=limit)
+            .order_by()
+            .values_list('closing_date', 'id')
+        )
+        heapq.heapify(queue)
+        return queue
+
+    def _report(self, closed):
+        for auction in closed:
+            winner = auction.winning_bid
+            result = f"won by {winner.bidder_id} at {winner.price}" if winner else "no bids"
+            self.stdout.write(f"{timezone.localtime(auction.closed_at):%Y-%m-%d %H:%M:%S} closed auction {auction.pk} ({result})")
@@ -0,0 +1,72 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from auctions.management.databases import require_local_database
+from auctions.seeding import generate_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera datos sinteticos a gran escala (usuarios, categorias, subastas, pujas, "
+        "valoraciones y comentarios) con bulk_create por lotes y un unico hash de "
+        "contrasena. Los datos se quedan en la base de datos; si no es local (p.ej. la "
+        "de produccion de .env) hay que confirmarlo con --force."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--auctions', type=int, default=100_000)
+        parser.add_argument('--bids', type=float, default=20.0, help="Media de pujas por subasta.")
+        parser.add_argument('--ratings', type=float, default=3.0, help="Media de valoraciones por subasta.")
+        parser.add_argument('--comments', type=float, default=2.0, help="Media de comentarios por subasta.")
+        parser.add_argument('--skew', type=float, default=1.0,
+                            help="Dispersion log-normal de filas por subasta (0 = todas iguales).")
+        parser.add_argument('--seller-skew', type=float, default=2.0,
+                            help="Concentracion de subastas en pocos vendedores (1 = uniforme).")
+        parser.add_argument('--closed-ratio', type=float, default=0.3, help="Fraccion de subastas ya cerradas.")
+        parser.add_argument('--open-days', type=float, default=7.0, help="Dias medios hasta el cierre de las abiertas.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int)
+        parser.add_argument('--force', action='store_true', help="Escribir aunque la base de datos no sea local.")
+
+    def handle(self, *args, **options):
+        require_local_database(options['force'])
+        if not 0 <= options['closed_ratio'] <= 1:
+            raise CommandError("--closed-ratio must be between 0 and 1.")
+        if options['users'] < 1 or options['categories'] < 1:
+            raise CommandError("At least one user and one category are required.")
+
+        started = time.perf_counter()
+        reported = {}
+
+        def progress(model, rows):
+            # Una linea cada ~100k filas por modelo
+            if rows // 100_000 != reported.get(model, 0) // 100_000:
+                self.stdout.write(f"  {model:<10} {rows:>12,} rows  ({time.perf_counter() - started:.0f} s)")
+            reported[model] = rows
+
+        counts = generate_dataset(
+            users=options['users'],
+            categories=options['categories'],
+            auctions=options['auctions'],
+            bids_per_auction=options['bids'],
+            ratings_per_auction=options['ratings'],
+            comments_per_auction=options['comments'],
+            skew=options['skew'],
+            seller_skew=options['seller_skew'],
+            closed_ratio=options['closed_ratio'],
+            open_days=options['open_days'],
+            batch_size=options['batch_size'],
+            seed=options['seed'],
+            progress=progress,
+        )
+
+        elapsed = time.perf_counter() - started
+        total = sum(counts.values())
+        for model, rows in counts.items():
+            self.stdout.write(f"{model:<10} {rows:>12,}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {total:,} rows in {elapsed:.1f} s ({total / elapsed:,.0f} rows/s)."
+        ))
@@ -0,0 +1,77 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from django.test import Client
+from django.test.utils import override_settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide la latencia de un endpoint abriendo una conexion a la BD por peticion "
+        "(CONN_MAX_AGE = 0) frente a reutilizar conexiones (persistentes o pool). "
+        "La cache de listados se desactiva: cada peticion tiene que llegar a la BD."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='/api/auctions/')
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--conn-max-age', type=int, default=60, help="CONN_MAX_AGE del modo persistente.")
+
+    def handle(self, *args, **options):
+        connection = connections['default']
+        configured = connection.settings_dict['CONN_MAX_AGE']
+        pooled = bool(connection.settings_dict.get('OPTIONS', {}).get('pool'))
+        client = Client(SERVER_NAME='localhost')
+
+        modes = [("new connection per request", 0)]
+        if pooled:
+            self.stdout.write("Connection pool enabled: both modes reuse pooled connections.")
+            modes.append(("connection pool", 0))
+        else:
+            modes.append((f"persistent connections (CONN_MAX_AGE={options['conn_max_age']})", options['conn_max_age']))
+
+        # Un acierto de la cache de listados no abre conexion: no mediria nada
+        caches = {**settings.CACHES, 'loadtest': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        try:
+            with override_settings(CACHES=caches, API_CACHE_ALIAS='loadtest'):
+                results = [
+                    (label, self._run(client, connection, max_age, options))
+                    for label, max_age in modes
+                ]
+        finally:
+            connection.close()
+            connection.settings_dict['CONN_MAX_AGE'] = configured
+
+        for label, timings in results:
+            timings.sort()
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(
+                "  mean %.2f ms  p50 %.2f ms  p99 %.2f ms"
+                % (
+                    statistics.mean(timings),
+                    timings[len(timings) // 2],
+                    timings[min(len(timings) - 1, int(len(timings) * 0.99))],
+                )
+            )
+
+    def _run(self, client, connection, max_age, options):
+        # Empieza sin conexion para que la siguiente use el CONN_MAX_AGE del modo
+        connection.close()
+        connection.settings_dict['CONN_MAX_AGE'] = max_age
+        timings = []
+        for i in range(options['warmup'] + options['requests']):
+            start = time.perf_counter()
+            response = client.get(options['url'])
+            # El cliente de test no lanza close_old_connections al terminar la
+            # peticion; se hace a mano como lo haria el handler WSGI/ASGI
+            close_old_connections()
+            elapsed = (time.perf_counter() - start) * 1000
+            if response.status_code >= 400:
+                self.stderr.write(f"{options['url']} returned {response.status_code}")
+            if i >= options['warmup']:
+                timings.append(elapsed)
+        return timings
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from auctions.services import find_rating_summary_drift, rebuild_rating_summaries
+
+
+class Command(BaseCommand):
+    help = "Verifica y reconstruye los resumenes de valoraciones (RatingSummary) de las subastas."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help="Solo comprueba si hay desviaciones; termina con error si las encuentra.",
+        )
+
+    def handle(self, *args, **options):
+        drift = find_rating_summary_drift()
+        for auction_id, saved, actual in drift:
+            self.stdout.write(
+                f"Auction {auction_id}: stored count/total {saved[0]}/{saved[1]}, "
+                f"actual {actual[0]}/{actual[1]}"
+            )
+
+        if options['check']:
+            if drift:
+                raise CommandError(f"{len(drift)} rating summaries out of sync.")
+            self.stdout.write(self.style.SUCCESS("Rating summaries are in sync."))
+            return
+
+        rebuilt = rebuild_rating_summaries()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {rebuilt} rating summaries ({len(drift)} were out of sync)."
+        ))
@@ -0,0 +1,43 @@
+"""
+Bases de datos para los comandos de benchmark y generacion de datos.
+
+``.env`` apunta DATABASE_URL a la base de datos de produccion: los comandos que
+crean datos o tocan el esquema no deben ejecutarse contra ella por descuido.
+"""
+from contextlib import contextmanager
+
+from django.core.management.base import CommandError
+from django.db import connections
+from django.test.utils import setup_databases, teardown_databases
+
+LOCAL_HOSTS = {'', 'localhost', '127.0.0.1', '::1'}
+
+
+@contextmanager
+def scratch_database(verbosity=0):
+    """
+    Crea una base de datos de pruebas vacia y migrada (la misma que usa
+    ``manage.py test``: ``test_<nombre>`` en el mismo servidor, o en memoria
+    con SQLite), apunta la conexion a ella y la destruye al salir.
+    """
+    old_config = setup_databases(verbosity, interactive=False, aliases={'default'})
+    try:
+        yield connections['default']
+    finally:
+        teardown_databases(old_config, verbosity)
+
+
+def is_local_database(alias='default'):
+    connection = connections[alias]
+    return connection.vendor == 'sqlite' or connection.settings_dict.get('HOST', '') in LOCAL_HOSTS
+
+
+def require_local_database(force=False, alias='default'):
+    """CommandError si la base de datos no es local, salvo con ``--force``."""
+    if force or is_local_database(alias):
+        return
+    host = connections[alias].settings_dict.get('HOST')
+    raise CommandError(
+        f"DATABASE_URL points to a remote server ({host}). "
+        "Use a local database or pass --force to write to it anyway."
+    )
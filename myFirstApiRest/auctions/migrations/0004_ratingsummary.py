@@ -0,0 +1,47 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def build_rating_summaries(apps, schema_editor):
+    Rating = apps.get_model('auctions', 'Rating')
+    RatingSummary = apps.get_model('auctions', 'RatingSummary')
+    rows = (
+        Rating.objects.order_by()
+        .values('auction_id')
+        .annotate(count=Count('id'), total=Sum('value'))
+    )
+    RatingSummary.objects.bulk_create(
+        [
+            RatingSummary(
+                auction_id=row['auction_id'],
+                count=row['count'],
+                total=row['total'],
+                average=row['total'] / row['count'],
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0003_alter_bid_unique_together'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RatingSummary',
+            fields=[
+                ('auction', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating_summary', serialize=False, to='auctions.auction')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('average', models.FloatField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(build_rating_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_bid_stats(apps, schema_editor):
+    Auction = apps.get_model('auctions', 'Auction')
+    Bid = apps.get_model('auctions', 'Bid')
+    for auction in Auction.objects.filter(bids__isnull=False).distinct().iterator():
+        bids = Bid.objects.filter(auction_id=auction.pk)
+        top = bids.order_by('-price', 'creation_date').first()
+        auction.highest_bid = top.price
+        auction.highest_bidder_id = top.bidder_id
+        auction.bid_count = bids.count()
+        auction.save(update_fields=['highest_bid', 'highest_bidder', 'bid_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0004_ratingsummary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auction',
+            name='bid_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='auction',
+            name='highest_bid',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='auction',
+            name='highest_bidder',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='leading_auctions', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(fill_bid_stats, migrations.RunPython.noop),
+    ]
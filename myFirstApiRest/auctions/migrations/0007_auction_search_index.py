@@ -0,0 +1,34 @@
+from django.db import migrations
+
+# Misma expresion que auctions.search.SEARCH_DOCUMENT_SQL para que el
+# planificador use el indice en las busquedas
+CREATE_SEARCH_INDEX = """
+CREATE INDEX IF NOT EXISTS auction_search_gin_idx ON auctions_auction USING GIN ((
+    setweight(to_tsvector('spanish', coalesce("title", '')), 'A') ||
+    setweight(to_tsvector('spanish', coalesce("description", '')), 'B')
+))
+"""
+
+DROP_SEARCH_INDEX = "DROP INDEX IF EXISTS auction_search_gin_idx"
+
+
+def create_search_index(apps, schema_editor):
+    # Solo PostgreSQL; el resto de motores usa el indice invertido en memoria
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_SEARCH_INDEX)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_SEARCH_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0006_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0007_auction_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auction',
+            name='last_modified',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='auction',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery
+from django.utils import timezone
+
+
+def close_past_auctions(apps, schema_editor):
+    # Las subastas ya vencidas quedan cerradas en su fecha de cierre con la puja mas alta
+    Auction = apps.get_model('auctions', 'Auction')
+    Bid = apps.get_model('auctions', 'Bid')
+    top = Bid.objects.filter(auction=OuterRef('pk')).order_by('-price', 'creation_date').values('pk')[:1]
+    Auction.objects.filter(closing_date__lte=timezone.now()).update(
+        is_closed=True, closed_at=F('closing_date'), winning_bid=Subquery(top)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0008_auction_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auction',
+            name='closed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='auction',
+            name='is_closed',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='auction',
+            name='winning_bid',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='won_auction', to='auctions.bid'),
+        ),
+        migrations.AddIndex(
+            model_name='auction',
+            index=models.Index(condition=models.Q(('is_closed', False)), fields=['closing_date'], name='auction_pending_close_idx'),
+        ),
+        migrations.RunPython(close_past_auctions, migrations.RunPython.noop),
+    ]
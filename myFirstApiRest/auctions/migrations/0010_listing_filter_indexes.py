@@ -0,0 +1,31 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0009_auction_closing'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auction',
+            index=models.Index(fields=['brand', 'id'], name='auction_brand_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auction',
+            index=models.Index(fields=['price'], name='auction_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auction',
+            index=models.Index(fields=['bid_count'], name='auction_bid_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ratingsummary',
+            index=models.Index(fields=['average'], name='rating_summary_average_idx'),
+        ),
+    ]
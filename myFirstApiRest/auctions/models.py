@@ -1,12 +1,29 @@
 from decimal import Decimal
 from django.db import models
+from django.db.models import Count, F, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 from users.models import CustomUser
 
 
+class CategoryQuerySet(models.QuerySet):
+    def with_auction_counts(self):
+        # Subastas totales y abiertas por categoria en una sola consulta agrupada
+        return self.annotate(
+            auction_count=Count("auctions"),
+            open_auction_count=Count(
+                "auctions",
+                filter=Q(auctions__is_closed=False, auctions__closing_date__gt=timezone.now()),
+            ),
+        )
+
+
 class Category(models.Model):
     name = models.CharField(max_length=50, blank=False, unique=True)
 
+    objects = CategoryQuerySet.as_manager()
+
     class Meta:
         ordering = ("id",)
 
@@ -14,6 +31,24 @@ class Category(models.Model):
         return self.name
 
 
+class AuctionQuerySet(models.QuerySet):
+    def open(self):
+        # Sin cerrar en BD y con la fecha de cierre aun por llegar
+        return self.filter(is_closed=False, closing_date__gt=timezone.now())
+
+    def closed(self):
+        # Cerrada en BD o con la fecha de cierre ya pasada (aun sin procesar)
+        return self.filter(Q(is_closed=True) | Q(closing_date__lte=timezone.now()))
+
+    def with_rating_stats(self):
+        # Media y numero de valoraciones leidos del resumen desnormalizado
+        # (LEFT JOIN a RatingSummary, sin agregar las valoraciones)
+        return self.annotate(
+            avg_rating=F("rating_summary__average"),
+            rating_count=Coalesce(F("rating_summary__count"), 0),
+        )
+
+
 class Auction(models.Model):
     title = models.CharField(max_length=150)
     description = models.TextField()
@@ -27,9 +62,50 @@ class Auction(models.Model):
     creation_date = models.DateTimeField(auto_now_add=True)
     closing_date = models.DateTimeField()
     auctioneer = models.ForeignKey(CustomUser, related_name='auctions', on_delete=models.CASCADE)
+    # Estado de las pujas desnormalizado, mantenido al pujar (ver services)
+    highest_bid = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    highest_bidder = models.ForeignKey(
+        CustomUser, related_name='leading_auctions', null=True, blank=True, on_delete=models.SET_NULL
+    )
+    bid_count = models.PositiveIntegerField(default=0)
+    # Cambia con la subasta y con sus pujas, valoraciones y comentarios (ETag / Last-Modified)
+    version = models.PositiveIntegerField(default=0)
+    last_modified = models.DateTimeField(auto_now=True)
+    # Cierre persistido por el motor de cierre (ver services.close_auction)
+    is_closed = models.BooleanField(default=False)
+    closed_at = models.DateTimeField(null=True, blank=True)
+    winning_bid = models.OneToOneField(
+        'Bid', related_name='won_auction', null=True, blank=True, on_delete=models.SET_NULL
+    )
+
+    objects = AuctionQuerySet.as_manager()
+
+    @property
+    def is_open(self):
+        return not self.is_closed and self.closing_date > timezone.now()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Estado original para saber si cambian los recuentos por categoria
+        instance._loaded_category_state = (instance.__dict__.get('category_id'), instance.__dict__.get('is_closed'))
+        return instance
 
     class Meta:
         ordering = ("id",)
+        indexes = [
+            # isOpen (closing_date > now) y filtros por categoria abiertos/cerrados
+            models.Index(fields=["closing_date"], name="auction_closing_date_idx"),
+            models.Index(fields=["category", "closing_date"], name="auction_category_closing_idx"),
+            # user_auctions: subastas de un usuario ordenadas por id
+            models.Index(fields=["auctioneer", "id"], name="auction_auctioneer_id_idx"),
+            # Solo las subastas sin cerrar: ?open=true y las pendientes del motor de cierre
+            models.Index(fields=["closing_date"], condition=Q(is_closed=False), name="auction_pending_close_idx"),
+            # Filtros y ordenes del listado (ver auctions/filters.py)
+            models.Index(fields=["brand", "id"], name="auction_brand_id_idx"),
+            models.Index(fields=["price"], name="auction_price_idx"),
+            models.Index(fields=["bid_count"], name="auction_bid_count_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -44,6 +120,10 @@ class Bid(models.Model):
     class Meta:
         unique_together = ('bidder', 'auction')  # Un usuario solo puede pujar una vez en cada subasta
         ordering = ('price',)
+        indexes = [
+            # Pujas de una subasta de mayor a menor precio (bids/, puja mas alta)
+            models.Index(fields=['auction', '-price'], name='bid_auction_price_idx'),
+        ]
 
     def __str__(self):
         return f"Bid {self.id} for Auction {self.auction.title}"
@@ -59,9 +139,37 @@ class Rating(models.Model):
     class Meta:
         unique_together = ('user', 'auction')  # Un usuario solo puede valorar una vez cada subasta
         ordering = ('id',)
+        indexes = [
+            models.Index(fields=['auction', 'id'], name='rating_auction_id_idx'),
+        ]
 
     def __str__(self):
         return f'Rating {self.value} by {self.user} for {self.auction}'
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Valor original para actualizar el resumen de la subasta por diferencia
+        instance._loaded_value = instance.__dict__.get('value')
+        return instance
+
+
+class RatingSummary(models.Model):
+    auction = models.OneToOneField(
+        Auction, on_delete=models.CASCADE, primary_key=True, related_name='rating_summary'
+    )
+    count = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    average = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # ?min_rating y ?ordering=average_rating del listado de subastas
+            models.Index(fields=['average'], name='rating_summary_average_idx'),
+        ]
+
+    def __str__(self):
+        return f'Rating summary for auction {self.auction_id}: {self.average} ({self.count})'
     
 class Comment(models.Model):
     title = models.TextField()
@@ -74,6 +182,9 @@ class Comment(models.Model):
     class Meta:
         unique_together = ('user', 'auction')  # Un usuario solo puede comentar una vez en cada subasta
         ordering = ('id',)
+        indexes = [
+            models.Index(fields=['auction', 'id'], name='comment_auction_id_idx'),
+        ]
 
     def __str__(self):
         return f'Comment by {self.user} for {self.auction}'
\ No newline at end of file
@@ -0,0 +1,151 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, Cursor, CursorPagination, PageNumberPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Paginacion por clave (keyset): filtra por la ultima posicion vista en lugar
+    de usar OFFSET y no hace COUNT(*), asi que el coste de una pagina no depende
+    de su profundidad. El orden se toma del atributo ``cursor_ordering`` de la vista.
+
+    A diferencia de CursorPagination de DRF, que guarda solo el primer campo del
+    orden y resuelve los empates con un OFFSET (limitado a ``offset_cutoff``), el
+    cursor guarda el valor de todos los campos y filtra por la tupla completa
+    ``(campo, ..., id) > posicion``: los empates no necesitan OFFSET. El orden
+    termina siempre en ``id`` para que la posicion sea unica; sus campos no
+    pueden ser nulos.
+    """
+    ordering = 'id'
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'cursor_ordering', self.ordering)
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        ordering = tuple(ordering)
+        if not {'id', '-id', 'pk', '-pk'} & set(ordering):
+            ordering += ('-id' if ordering[0].startswith('-') else 'id',)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        position = self._decode_position(self.cursor)
+
+        # Hacia atras se recorre el orden invertido y luego se da la vuelta a la pagina
+        ordering = [self._invert(field) if reverse else field for field in self.ordering]
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            try:
+                queryset = queryset.filter(self._after(ordering, position))
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+        self.has_next = position is not None if reverse else has_more
+        self.has_previous = has_more if reverse else position is not None
+        self.display_page_controls = self.has_next or self.has_previous
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        position = self._position(self.page[-1]) if self.page else self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        # Pagina vacia (filas borradas o filtradas tras el cursor): se vuelve desde su posicion
+        position = self._position(self.page[0]) if self.page else self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith('-') else '-' + field
+
+    def _position(self, row):
+        # Valores como texto: el ORM los vuelve a convertir al filtrar
+        values = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            values.append(str(row[name] if isinstance(row, dict) else getattr(row, name)))
+        return json.dumps(values)
+
+    def _decode_position(self, cursor):
+        if cursor is None or cursor.position is None:
+            return None
+        try:
+            values = json.loads(cursor.position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def _after(self, ordering, position):
+        # (a, b, id) > (x, y, z)  ==  a > x  OR  (a = x AND b > y)  OR  ...
+        condition, equal = Q(), {}
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+
+class PageOrCursorPagination(BasePagination):
+    """
+    Paginacion por numero de pagina (la de siempre) o por cursor, a eleccion de
+    cada peticion: ``?pagination=cursor`` pide la primera pagina por cursor y los
+    enlaces ``next``/``previous`` llevan el parametro ``cursor``.
+    """
+    mode_query_param = 'pagination'
+
+    def __init__(self):
+        self.page_paginator = PageNumberPagination()
+        self.cursor_paginator = KeysetPagination()
+        self.paginator = self.page_paginator
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.cursor_paginator.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.paginator = self.cursor_paginator if self.use_cursor(request) else self.page_paginator
+        return self.paginator.paginate_queryset(queryset, request, view=view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.page_paginator.get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            *self.page_paginator.get_schema_operation_parameters(view),
+            {
+                'name': self.mode_query_param,
+                'required': False,
+                'in': 'query',
+                'description': "Use 'cursor' for keyset pagination.",
+                'schema': {'type': 'string', 'enum': ['page', 'cursor']},
+            },
+            *self.cursor_paginator.get_schema_operation_parameters(view),
+        ]
@@ -0,0 +1,233 @@
+"""
+Canal de pujas en tiempo real (Server-Sent Events) servido por la app ASGI.
+
+``GET /api/auctions/<id>/bids/stream/`` abre un stream ``text/event-stream``
+que empieza con el estado actual de la subasta y emite un evento ``bid`` cada
+vez que se confirma una nueva puja mas alta o se sube una existente, y un
+evento ``withdraw`` cuando se retira una puja (ver services.py). Cada mensaje
+lleva la ``version`` de la subasta tras el cambio, que es tambien el id del
+evento. Los mensajes pasan por un broadcaster configurable con
+AUCTION_BROADCAST_BACKEND; el de por defecto vive en memoria del proceso,
+suficiente para un solo worker y para probar en local sin servicios externos.
+"""
+import asyncio
+import json
+import re
+import threading
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+STREAM_PATH = re.compile(r'^/api/auctions/(?P<auction_id>\d+)/bids/stream/$')
+# Mismo formato (y zona horaria) que los DateTimeField de los serializers
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+class InMemoryBroadcaster:
+    """
+    Suscriptores por subasta en el proceso actual. ``publish`` se puede llamar
+    desde cualquier hilo (las vistas sincronas); cada suscriptor recibe el
+    mensaje en la cola de su propio event loop.
+    """
+    queue_size = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def subscribe(self, auction_id):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(auction_id, set()).add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, auction_id, queue):
+        with self._lock:
+            subscribers = self._subscribers.get(auction_id, set())
+            subscribers.difference_update({item for item in subscribers if item[1] is queue})
+            if not subscribers:
+                self._subscribers.pop(auction_id, None)
+
+    def publish(self, auction_id, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(auction_id, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._deliver, queue, message)
+            except RuntimeError:
+                # El loop del suscriptor ya se ha cerrado
+                self.unsubscribe(auction_id, queue)
+
+    @staticmethod
+    def _deliver(queue, message):
+        # Un cliente lento pierde los mensajes mas antiguos, no bloquea al resto
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(message)
+
+
+_broadcaster = None
+_broadcaster_lock = threading.Lock()
+
+
+def get_broadcaster():
+    global _broadcaster
+    if _broadcaster is None:
+        with _broadcaster_lock:
+            if _broadcaster is None:
+                backend = getattr(settings, 'AUCTION_BROADCAST_BACKEND', 'auctions.realtime.InMemoryBroadcaster')
+                _broadcaster = import_string(backend)()
+    return _broadcaster
+
+
+def bid_message(bid, auction):
+    return {
+        'type': 'bid',
+        'auction': bid.auction_id,
+        'version': auction.version,
+        'bid': bid.pk,
+        'price': str(bid.price),
+        'bidder': str(bid.bidder),
+        'bid_count': auction.bid_count,
+        'creation_date': timezone.localtime(bid.creation_date).strftime(DATE_FORMAT),
+    }
+
+
+def withdraw_message(bid_id, auction):
+    return {
+        'type': 'withdraw',
+        'auction': auction.pk,
+        'version': auction.version,
+        'bid': bid_id,
+        # Nueva puja mas alta tras retirar la puja
+        'price': str(auction.highest_bid) if auction.highest_bid is not None else None,
+        'bid_count': auction.bid_count,
+    }
+
+
+def _publish_on_commit(auction_id, message):
+    transaction.on_commit(partial(get_broadcaster().publish, auction_id, message))
+
+
+def publish_bid(bid, auction):
+    """
+    Publica la nueva puja mas alta cuando se confirme la transaccion actual.
+    ``auction`` debe tener ya la version y el numero de pujas tras la puja.
+    """
+    _publish_on_commit(bid.auction_id, bid_message(bid, auction))
+
+
+def publish_withdraw(bid_id, auction):
+    """Publica la retirada de una puja con el estado de la subasta ya recalculado."""
+    _publish_on_commit(auction.pk, withdraw_message(bid_id, auction))
+
+
+def _auction_snapshot(auction_id):
+    from .models import Auction
+
+    try:
+        return (
+            Auction.objects.filter(pk=auction_id)
+            .values('id', 'version', 'highest_bid', 'bid_count', 'closing_date')
+            .first()
+        )
+    finally:
+        close_old_connections()
+
+
+def _event(name, data, event_id=None):
+    lines = [f"event: {name}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append("data: " + json.dumps(data))
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+async def bid_stream(scope, receive, send, auction_id):
+    if scope['method'] != 'GET':
+        await send({'type': 'http.response.start', 'status': 405, 'headers': [(b'allow', b'GET')]})
+        await send({'type': 'http.response.body', 'body': b''})
+        return
+
+    # Suscrito antes de leer el estado: una puja confirmada entre la lectura y la
+    # suscripcion se perderia. Los mensajes que ya recoge el estado se descartan
+    # por la version de la subasta (las pujas la bloquean y suben su version, asi
+    # que crece en orden de commit; los ids no, al subir o retirar una puja)
+    broadcaster = get_broadcaster()
+    queue = broadcaster.subscribe(auction_id)
+    try:
+        await _stream(scope, receive, send, auction_id, queue)
+    finally:
+        broadcaster.unsubscribe(auction_id, queue)
+
+
+async def _stream(scope, receive, send, auction_id, queue):
+    snapshot = await sync_to_async(_auction_snapshot)(auction_id)
+    if snapshot is None:
+        await send({'type': 'http.response.start', 'status': 404, 'headers': [(b'content-type', b'application/json')]})
+        await send({'type': 'http.response.body', 'body': b'{"detail": "No encontrado."}'})
+        return
+
+    headers = [
+        (b'content-type', b'text/event-stream'),
+        (b'cache-control', b'no-cache'),
+        (b'x-accel-buffering', b'no'),
+    ]
+    if getattr(settings, 'CORS_ALLOW_ALL_ORIGINS', False):
+        headers.append((b'access-control-allow-origin', b'*'))
+    await send({'type': 'http.response.start', 'status': 200, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': _event('snapshot', {
+        'auction': snapshot['id'],
+        'version': snapshot['version'],
+        'price': str(snapshot['highest_bid']) if snapshot['highest_bid'] is not None else None,
+        'bid_count': snapshot['bid_count'],
+        'closing_date': timezone.localtime(snapshot['closing_date']).strftime(DATE_FORMAT),
+    }), 'more_body': True})
+
+    version = snapshot['version']
+    disconnect = asyncio.ensure_future(_wait_for_disconnect(receive))
+    heartbeat = getattr(settings, 'AUCTION_STREAM_HEARTBEAT', 15)
+    try:
+        while not disconnect.done():
+            message = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({message, disconnect}, timeout=heartbeat, return_when=asyncio.FIRST_COMPLETED)
+            if message in done:
+                data = message.result()
+                if data['version'] <= version:
+                    continue
+                version = data['version']
+                body = _event(data['type'], data, event_id=version)
+            else:
+                message.cancel()
+                if disconnect in done:
+                    break
+                # Comentario SSE para que proxies y navegadores no corten la conexion
+                body = b': keepalive\n\n'
+            await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+    finally:
+        disconnect.cancel()
+
+
+async def _wait_for_disconnect(receive):
+    while True:
+        event = await receive()
+        if event['type'] == 'http.disconnect':
+            return
+
+
+class BidStreamRouter:
+    """Envuelve la app ASGI de Django y atiende aparte las rutas de streaming."""
+
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            match = STREAM_PATH.match(scope['path'])
+            if match:
+                return await bid_stream(scope, receive, send, int(match['auction_id']))
+        return await self.application(scope, receive, send)
@@ -0,0 +1,187 @@
+"""
+Busqueda de texto completo para el parametro ``search`` del listado de subastas.
+
+En PostgreSQL se usa un ``tsvector`` (titulo con peso A, descripcion con peso B)
+respaldado por el indice GIN de la migracion 0007. En el resto de motores
+(SQLite en local y tests) se usa un indice invertido en memoria del proceso. En
+ambos casos los resultados se ordenan por relevancia y la ultima palabra se
+busca como prefijo, para que la busqueda funcione mientras el usuario escribe.
+
+El indice en memoria es de cada proceso: se reconstruye cuando cambia la
+generacion ``search`` de la cache de listados (los signals de Auction la suben
+tras el commit) y, en cualquier caso, cuando tiene mas de
+``AUCTION_SEARCH_INDEX_TTL`` segundos. Con una cache compartida entre workers
+(Redis, Memcached...) los cambios se ven en la siguiente busqueda; con la cache
+local por defecto, los demas workers pueden tardar hasta el TTL en verlos.
+
+El buscador en memoria devuelve como mucho ``AUCTION_SEARCH_MAX_RESULTS``
+subastas (las mas relevantes de las que cumplen los demas filtros):
+``search_auctions`` indica si ha recortado el resultado para que el listado lo
+informe.
+"""
+import bisect
+import re
+import threading
+import time
+import unicodedata
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.expressions import RawSQL
+
+from .cache import get_generations
+
+SEARCH_CONFIG = 'spanish'
+
+# Debe coincidir exactamente con la expresion del indice GIN (migracion 0007)
+SEARCH_DOCUMENT_SQL = (
+    "setweight(to_tsvector('spanish', coalesce(\"auctions_auction\".\"title\", '')), 'A') || "
+    "setweight(to_tsvector('spanish', coalesce(\"auctions_auction\".\"description\", '')), 'B')"
+)
+
+# Columnas indexadas por el buscador
+SEARCH_FIELDS = {'title', 'description'}
+
+TITLE_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+
+
+def tokenize(text):
+    # Minusculas y sin tildes: "Jamón" y "jamon" son el mismo termino
+    normalized = unicodedata.normalize('NFKD', text.lower())
+    normalized = ''.join(char for char in normalized if not unicodedata.combining(char))
+    return re.findall(r'\w+', normalized)
+
+
+class InvertedIndex:
+    """
+    Indice invertido en memoria: termino -> {auction_id: peso}. Se construye
+    perezosamente al buscar y se reconstruye entero cuando queda obsoleto.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = None
+        self._terms = []
+        self._generation = None
+        self._built_at = 0
+
+    def _document(self, title, description):
+        weights = {}
+        for token in tokenize(title or ''):
+            weights[token] = weights.get(token, 0) + TITLE_WEIGHT
+        for token in tokenize(description or ''):
+            weights[token] = weights.get(token, 0) + DESCRIPTION_WEIGHT
+        return weights
+
+    def _build(self, generation):
+        from .models import Auction
+
+        self._postings = {}
+        for pk, title, description in Auction.objects.values_list('id', 'title', 'description').iterator():
+            for token, weight in self._document(title, description).items():
+                self._postings.setdefault(token, {})[pk] = weight
+        self._terms = sorted(self._postings)
+        self._generation = generation
+        self._built_at = time.monotonic()
+
+    def _is_stale(self, generation):
+        ttl = getattr(settings, 'AUCTION_SEARCH_INDEX_TTL', 60)
+        return (
+            self._postings is None
+            or generation != self._generation
+            or time.monotonic() - self._built_at > ttl
+        )
+
+    def invalidate(self):
+        with self._lock:
+            self._postings = None
+            self._terms = []
+
+    def _matches(self, token, prefix):
+        if not prefix:
+            return self._postings.get(token, {})
+        # Todos los terminos que empiezan por el prefijo (lista ordenada)
+        matches = {}
+        start = bisect.bisect_left(self._terms, token)
+        for term in self._terms[start:]:
+            if not term.startswith(token):
+                break
+            for pk, weight in self._postings[term].items():
+                matches[pk] = max(matches.get(pk, 0), weight)
+        return matches
+
+    def search(self, text):
+        """Devuelve {auction_id: puntuacion} de las subastas que contienen todos los terminos."""
+        tokens = tokenize(text)
+        if not tokens:
+            return {}
+        [generation] = get_generations(['search'])
+        with self._lock:
+            if self._is_stale(generation):
+                self._build(generation)
+            scores = None
+            for position, token in enumerate(tokens):
+                matches = self._matches(token, prefix=position == len(tokens) - 1)
+                if scores is None:
+                    scores = dict(matches)
+                else:
+                    scores = {pk: score + matches[pk] for pk, score in scores.items() if pk in matches}
+                if not scores:
+                    return {}
+            return scores
+
+
+search_index = InvertedIndex()
+
+
+def _postgres_search(queryset, text):
+    from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+
+    tokens = re.findall(r'\w+', text)
+    if not tokens:
+        return queryset.none()
+    # Todos los terminos obligatorios y el ultimo como prefijo
+    raw = ' & '.join(tokens[:-1] + [f'{tokens[-1]}:*'])
+    query = SearchQuery(raw, config=SEARCH_CONFIG, search_type='raw')
+    return (
+        queryset.alias(search_document=RawSQL(SEARCH_DOCUMENT_SQL, [], output_field=SearchVectorField()))
+        .filter(search_document=query)
+        .annotate(search_rank=SearchRank(F('search_document'), query))
+        .order_by('-search_rank', 'id')
+    )
+
+
+def _index_search(queryset, text):
+    scores = search_index.search(text)
+    if scores:
+        # Primero los filtros del listado y despues el limite: si no, las subastas
+        # filtradas podrian quedar fuera de las mas relevantes de toda la tabla.
+        # Se leen los ids filtrados (sin IN) para no depender del numero de coincidencias
+        filtered = queryset.order_by().values_list('pk', flat=True).iterator()
+        scores = {pk: scores[pk] for pk in filtered if pk in scores}
+    if not scores:
+        return queryset.none(), False
+    limit = getattr(settings, 'AUCTION_SEARCH_MAX_RESULTS', 1000)
+    best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    queryset = (
+        queryset.filter(pk__in=[pk for pk, _ in best])
+        .annotate(search_rank=Case(
+            *[When(pk=pk, then=Value(score)) for pk, score in best],
+            output_field=FloatField(),
+        ))
+        .order_by('-search_rank', 'id')
+    )
+    return queryset, len(scores) > limit
+
+
+def search_auctions(queryset, text):
+    """
+    Filtra el queryset de subastas por ``text`` y lo ordena por relevancia.
+    Devuelve (queryset, recortado): recortado es True si el buscador en memoria
+    ha descartado coincidencias por ``AUCTION_SEARCH_MAX_RESULTS``.
+    """
+    if connections[queryset.db].vendor == 'postgresql':
+        return _postgres_search(queryset, text), False
+    return _index_search(queryset, text)
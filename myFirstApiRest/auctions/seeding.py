@@ -0,0 +1,270 @@
+import itertools
+import math
+import random
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.db.models import F, OuterRef, Subquery
+from django.utils import timezone
+
+from users.models import CustomUser
+from .cache import bump_generation
+from .models import Auction, Bid, Category, Comment, Rating, RatingSummary
+from .search import search_index
+
+BRANDS = ["Joselito", "Cinco Jotas", "Sánchez Romero Carvajal", "Maldonado", "Covap", "Arturo Sánchez"]
+
+
+@transaction.atomic
+def seed_dataset(users=50, categories=5, auctions=200, bids_per_auction=10,
+                 ratings_per_auction=5, comments_per_auction=3, batch_size=1000, seed=None):
+    """
+    Crea un juego de datos sintetico con bulk_create y rellena los datos
+    desnormalizados (puja mas alta, resumen de valoraciones) que normalmente
+    mantienen los signals. Devuelve los objetos creados por modelo.
+    """
+    rng = random.Random(seed)
+    tag = uuid.uuid4().hex[:8]
+    now = timezone.now()
+    # Un solo hash para todos los usuarios: hashear por fila es lo mas lento
+    password = make_password("seed-password")
+
+    created_users = CustomUser.objects.bulk_create(
+        [
+            CustomUser(username=f"seed-{tag}-{i}", password=password, birth_date="1990-01-01")
+            for i in range(users)
+        ],
+        batch_size=batch_size,
+    )
+    created_categories = Category.objects.bulk_create(
+        [Category(name=f"Seed {tag} {i}") for i in range(categories)],
+        batch_size=batch_size,
+    )
+    created_auctions = Auction.objects.bulk_create(
+        [
+            Auction(
+                title=f"Jamón ibérico lote {i}",
+                description=f"Pieza de bellota número {i} de la subasta de prueba {tag}",
+                price=Decimal(rng.randint(1000, 50000)) / 100,
+                stock=rng.randint(1, 10),
+                brand=rng.choice(BRANDS),
+                category=rng.choice(created_categories),
+                thumbnail=f"https://example.com/{tag}/{i}.png",
+                closing_date=now + timedelta(hours=rng.randint(-24 * 30, 24 * 30)),
+                auctioneer=rng.choice(created_users),
+            )
+            for i in range(auctions)
+        ],
+        batch_size=batch_size,
+    )
+
+    bids, ratings, comments, summaries = [], [], [], []
+    for auction in created_auctions:
+        price = auction.price
+        auction_bids = []
+        for bidder in rng.sample(created_users, min(bids_per_auction, users)):
+            price += Decimal(rng.randint(1, 500)) / 100
+            auction_bids.append(Bid(auction=auction, price=price, bidder=bidder))
+        if auction_bids:
+            auction.highest_bid = auction_bids[-1].price
+            auction.highest_bidder = auction_bids[-1].bidder
+            auction.bid_count = len(auction_bids)
+        bids.extend(auction_bids)
+
+        values = []
+        for user in rng.sample(created_users, min(ratings_per_auction, users)):
+            values.append(rng.randint(1, 5))
+            ratings.append(Rating(auction=auction, user=user, value=values[-1]))
+        if values:
+            summaries.append(RatingSummary(
+                auction=auction, count=len(values), total=sum(values), average=sum(values) / len(values)
+            ))
+
+        for user in rng.sample(created_users, min(comments_per_auction, users)):
+            comments.append(Comment(auction=auction, user=user, title="Opinión", text="Muy buena pieza."))
+
+    Bid.objects.bulk_create(bids, batch_size=batch_size)
+    Rating.objects.bulk_create(ratings, batch_size=batch_size)
+    RatingSummary.objects.bulk_create(summaries, batch_size=batch_size)
+    Comment.objects.bulk_create(comments, batch_size=batch_size)
+    Auction.objects.bulk_update(
+        created_auctions, ['highest_bid', 'highest_bidder', 'bid_count'], batch_size=batch_size
+    )
+    # bulk_create no lanza signals: el buscador en memoria se reconstruye al consultar
+    search_index.invalidate()
+
+    return {
+        'users': created_users,
+        'categories': created_categories,
+        'auctions': created_auctions,
+        'bids': bids,
+        'ratings': ratings,
+        'comments': comments,
+    }
+
+
+def _skewed_count(rng, mean, sigma, cap):
+    # Log-normal con la media pedida: la mayoria de subastas con pocas filas y
+    # una cola larga de subastas muy disputadas (sigma = 0 da siempre la media)
+    if mean <= 0:
+        return 0
+    if sigma <= 0:
+        return min(cap, round(mean))
+    mu = math.log(mean) - sigma ** 2 / 2
+    return min(cap, int(rng.lognormvariate(mu, sigma)))
+
+
+def _closing_date(rng, now, closed_ratio, open_days):
+    # Cerradas en los ultimos dos meses; abiertas con cierre cercano mas probable
+    if rng.random() < closed_ratio:
+        return now - timedelta(seconds=rng.uniform(0, 60 * 24 * 3600))
+    return now + timedelta(hours=1) + timedelta(days=rng.expovariate(1 / open_days))
+
+
+def _others(rng, user_ids, excluded, count):
+    # count usuarios distintos sin excluded; muestrear uno de mas evita copiar la lista
+    sample = rng.sample(user_ids, min(count + 1, len(user_ids)))
+    return [user_id for user_id in sample if user_id != excluded][:count]
+
+
+def generate_dataset(users=10_000, categories=20, auctions=100_000, bids_per_auction=20.0,
+                     ratings_per_auction=3.0, comments_per_auction=2.0, skew=1.0, seller_skew=2.0,
+                     closed_ratio=0.3, open_days=7.0, batch_size=5000, seed=None, progress=None):
+    """
+    Generador para volumenes grandes (millones de filas). A diferencia de
+    seed_dataset no guarda los objetos en memoria: inserta las subastas por
+    lotes, cada lote en su propia transaccion, con sus pujas, valoraciones y
+    comentarios y los datos desnormalizados ya calculados (sin bulk_update).
+    Todas las filas se crean con fecha de creacion ``now``.
+
+    - Pujas, valoraciones y comentarios por subasta siguen una log-normal con
+      la media indicada y dispersion ``skew``.
+    - Unos pocos vendedores concentran la mayoria de subastas (``seller_skew``)
+      y las categorias siguen una distribucion de Zipf.
+    - ``closed_ratio`` de las subastas ya han cerrado (con ``is_closed``,
+      ``closed_at`` y la puja ganadora); las abiertas cierran en una media de
+      ``open_days`` dias.
+    - El vendedor no puja ni valora sus propias subastas.
+
+    ``progress(model, rows)`` se llama tras cada insercion. Devuelve el numero
+    de filas creadas por modelo.
+    """
+    rng = random.Random(seed)
+    tag = uuid.uuid4().hex[:8]
+    now = timezone.now()
+    password = make_password("seed-password")
+    counts = dict.fromkeys(['users', 'categories', 'auctions', 'bids', 'ratings', 'comments'], 0)
+
+    def insert(model, objects, key):
+        model.objects.bulk_create(objects, batch_size=batch_size)
+        counted(key, len(objects))
+
+    def insert_rows(model, fields, rows, key):
+        # Pujas, valoraciones y comentarios son casi todas las filas: se insertan
+        # como tuplas con executemany, sin instanciar modelos ni compilar cada fila
+        columns = ', '.join(connection.ops.quote_name(model._meta.get_field(name).column) for name in fields)
+        sql = (
+            f"INSERT INTO {connection.ops.quote_name(model._meta.db_table)} ({columns}) "
+            f"VALUES ({', '.join(['%s'] * len(fields))})"
+        )
+        with connection.cursor() as cursor:
+            for start in range(0, len(rows), batch_size):
+                cursor.executemany(sql, rows[start:start + batch_size])
+        counted(key, len(rows))
+
+    def counted(key, rows):
+        counts[key] += rows
+        if progress:
+            progress(key, counts[key])
+
+    # Valores adaptados al formato del motor una sola vez (o sin pasar por el campo)
+    ops = connection.ops
+    price_field = Bid._meta.get_field('price')
+    created = Bid._meta.get_field('creation_date').get_db_prep_save(now, connection)
+
+    def adapt_price(price):
+        return ops.adapt_decimalfield_value(price, price_field.max_digits, price_field.decimal_places)
+
+    user_ids = []
+    for start in range(0, users, batch_size):
+        with transaction.atomic():
+            batch = [
+                CustomUser(username=f"gen-{tag}-{i}", password=password, birth_date="1990-01-01")
+                for i in range(start, min(users, start + batch_size))
+            ]
+            insert(CustomUser, batch, 'users')
+        user_ids.extend(user.pk for user in batch)
+
+    category_objects = [Category(name=f"Gen {tag} {i}") for i in range(categories)]
+    with transaction.atomic():
+        insert(Category, category_objects, 'categories')
+    category_ids = [category.pk for category in category_objects]
+    category_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(category_ids))))
+
+    for start in range(0, auctions, batch_size):
+        rows = []
+        for i in range(start, min(auctions, start + batch_size)):
+            price = Decimal(rng.randint(1000, 50000)) / 100
+            auction = Auction(
+                title=f"Jamón ibérico lote {i}",
+                description=f"Pieza de bellota número {i} ({tag})",
+                price=price,
+                stock=rng.randint(1, 10),
+                brand=rng.choice(BRANDS),
+                category_id=rng.choices(category_ids, cum_weights=category_weights)[0],
+                thumbnail=f"https://example.com/{tag}/{i}.png",
+                closing_date=_closing_date(rng, now, closed_ratio, open_days),
+                auctioneer_id=user_ids[int(len(user_ids) * rng.random() ** seller_skew)],
+            )
+            others = len(user_ids) - 1
+            bids = []
+            bidders = _others(rng, user_ids, auction.auctioneer_id, _skewed_count(rng, bids_per_auction, skew, others))
+            for bidder_id in bidders:
+                # Incrementos del 1-5% del precio de salida (crecimiento lineal)
+                price += max(Decimal("0.01"), (auction.price * Decimal(rng.uniform(0.01, 0.05))).quantize(Decimal("0.01")))
+                bids.append((bidder_id, price))
+            if bids:
+                auction.highest_bidder_id, auction.highest_bid = bids[-1]
+                auction.bid_count = len(bids)
+            raters = _others(rng, user_ids, auction.auctioneer_id, _skewed_count(rng, ratings_per_auction, skew, others))
+            commenters = rng.sample(user_ids, _skewed_count(rng, comments_per_auction, skew, len(user_ids)))
+            rows.append((auction, bids, [(user_id, rng.randint(1, 5)) for user_id in raters], commenters))
+
+        with transaction.atomic():
+            insert(Auction, [auction for auction, *_ in rows], 'auctions')
+            insert_rows(Bid, ['auction', 'bidder', 'price', 'creation_date'], [
+                (auction.pk, bidder_id, adapt_price(price), created)
+                for auction, bids, _, _ in rows for bidder_id, price in bids
+            ], 'bids')
+            insert_rows(Rating, ['auction', 'user', 'value'], [
+                (auction.pk, user_id, value)
+                for auction, _, ratings, _ in rows for user_id, value in ratings
+            ], 'ratings')
+            RatingSummary.objects.bulk_create([
+                RatingSummary(
+                    auction=auction,
+                    count=len(ratings),
+                    total=sum(value for _, value in ratings),
+                    average=sum(value for _, value in ratings) / len(ratings),
+                )
+                for auction, _, ratings, _ in rows if ratings
+            ], batch_size=batch_size)
+            insert_rows(Comment, ['auction', 'user', 'title', 'text', 'creation_date', 'edit_date'], [
+                (auction.pk, user_id, "Opinión", "Muy buena pieza.", created, created)
+                for auction, _, _, commenters in rows for user_id in commenters
+            ], 'comments')
+            # Las ya vencidas, cerradas como lo haria close_auctions (ver migracion 0009)
+            top = Bid.objects.filter(auction=OuterRef('pk')).order_by('-price', 'creation_date').values('pk')[:1]
+            Auction.objects.filter(
+                pk__in=[auction.pk for auction, *_ in rows], closing_date__lte=now
+            ).update(is_closed=True, closed_at=F('closing_date'), winning_bid=Subquery(top))
+
+    # Sin signals: se reconstruye el buscador en memoria y se invalidan los listados cacheados
+    search_index.invalidate()
+    bump_generation('search')
+    bump_generation('categories')
+    bump_generation('auctions')
+    return counts
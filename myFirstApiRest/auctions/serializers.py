@@ -1,20 +1,69 @@
 from rest_framework import serializers
-from .models import Category, Auction, Bid, Rating, Comment
+from .models import Category, Auction, Bid, Rating, RatingSummary, Comment
 from django.utils import timezone
 from drf_spectacular.utils import extend_schema_field
 from datetime import timedelta
 
+
+def average_rating(auction):
+    # Las vistas anotan avg_rating con with_rating_stats(); si la instancia no
+    # viene anotada (p.ej. recien creada) se lee su resumen de valoraciones
+    if hasattr(auction, "avg_rating"):
+        avg = auction.avg_rating
+    else:
+        avg = (
+            RatingSummary.objects.filter(auction_id=auction.pk)
+            .values_list("average", flat=True)
+            .first()
+        )
+    if avg is None:
+        return 1.0
+    return round(avg, 2)
+
 class CategoryListCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ['id','name']
 
+class CategoryCountsSerializer(CategoryListCreateSerializer):
+    # Anotaciones de Category.objects.with_auction_counts()
+    auction_count = serializers.IntegerField(read_only=True)
+    open_auction_count = serializers.IntegerField(read_only=True)
+
+    class Meta(CategoryListCreateSerializer.Meta):
+        fields = ['id', 'name', 'auction_count', 'open_auction_count']
+
 class CategoryDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = '__all__'
 
-class AuctionListCreateSerializer(serializers.ModelSerializer):
+def requested_expansions(request):
+    # Relaciones pedidas con ?expand=a,b (p.ej. expand=auctioneer)
+    if request is None:
+        return set()
+    params = getattr(request, "query_params", request.GET)
+    return {name.strip() for name in params.get("expand", "").split(",") if name.strip()}
+
+
+def select_expansions(queryset, request):
+    # Carga en la misma consulta las relaciones que se van a incrustar
+    if "auctioneer" in requested_expansions(request):
+        return queryset.select_related("auctioneer")
+    return queryset
+
+
+class ExpandAuctioneerMixin:
+    """Con ?expand=auctioneer devuelve {id, username} en lugar de solo el id del subastador."""
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if "auctioneer" in requested_expansions(self.context.get("request")):
+            data["auctioneer"] = {"id": instance.auctioneer_id, "username": instance.auctioneer.username}
+        return data
+
+
+class AuctionListCreateSerializer(ExpandAuctioneerMixin, serializers.ModelSerializer):
     creation_date = serializers.DateTimeField(format="%Y-%m-%dT%H:%M:%SZ", read_only=True)
     closing_date = serializers.DateTimeField(format="%Y-%m-%dT%H:%M:%SZ")
     isOpen = serializers.SerializerMethodField(read_only=True)
@@ -24,10 +73,14 @@ class AuctionListCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Auction
         fields = '__all__'
+        read_only_fields = [
+            'highest_bid', 'highest_bidder', 'bid_count', 'version', 'last_modified',
+            'is_closed', 'closed_at', 'winning_bid',
+        ]
 
     @extend_schema_field(serializers.BooleanField())
     def get_isOpen(self, obj):
-        return obj.closing_date > timezone.now()
+        return obj.is_open
 
     def validate_closing_date(self, value):
         # Ensure closing date is greater than now
@@ -40,15 +93,13 @@ class AuctionListCreateSerializer(serializers.ModelSerializer):
 
         return value
     
+    @extend_schema_field(serializers.FloatField())
     def get_average_rating(self, obj):
-        ratings = obj.ratings.all()
-        if ratings.exists():
-            return round(sum(r.value for r in ratings) / ratings.count(), 2)
-        return 1.0
+        return average_rating(obj)
 
 
 
-class AuctionDetailSerializer(serializers.ModelSerializer):
+class AuctionDetailSerializer(ExpandAuctioneerMixin, serializers.ModelSerializer):
     creation_date = serializers.DateTimeField(format="%Y-%m-%dT%H:%M:%SZ", read_only=True)
     closing_date = serializers.DateTimeField(format="%Y-%m-%dT%H:%M:%SZ")
     isOpen = serializers.SerializerMethodField(read_only=True)
@@ -57,10 +108,14 @@ class AuctionDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Auction
         fields = '__all__'
+        read_only_fields = [
+            'highest_bid', 'highest_bidder', 'bid_count', 'version', 'last_modified',
+            'is_closed', 'closed_at', 'winning_bid',
+        ]
 
     @extend_schema_field(serializers.BooleanField())
     def get_isOpen(self, obj):
-        return obj.closing_date > timezone.now()
+        return obj.is_open
     
     def validate_closing_date(self, value):
         if value <= timezone.now():
@@ -68,11 +123,9 @@ class AuctionDetailSerializer(serializers.ModelSerializer):
 
         return value
     
+    @extend_schema_field(serializers.FloatField())
     def get_average_rating(self, obj):
-        ratings = obj.ratings.all()
-        if ratings.exists():
-            return round(sum(r.value for r in ratings) / ratings.count(), 2)
-        return 1.0
+        return average_rating(obj)
     
 class BidListCreateSerializer(serializers.ModelSerializer):
     creation_date = serializers.DateTimeField(format="%Y-%m-%dT%H:%M:%SZ", read_only=True)
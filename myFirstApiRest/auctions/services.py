@@ -0,0 +1,222 @@
+from decimal import Decimal
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+from rest_framework.exceptions import NotFound, ValidationError
+from .models import Auction, Bid, Rating, RatingSummary
+from .realtime import publish_bid, publish_withdraw
+
+BID_STATS_FIELDS = ['highest_bid', 'highest_bidder', 'bid_count']
+CLOSING_FIELDS = ['is_closed', 'closed_at', 'winning_bid']
+
+
+def apply_rating_change(auction_id, count_delta, total_delta, create=True):
+    """
+    Actualiza de forma incremental el resumen de valoraciones de una subasta.
+    Bloquea la fila del resumen para que escrituras concurrentes no se pisen.
+    """
+    with transaction.atomic():
+        summaries = RatingSummary.objects.select_for_update()
+        if create:
+            summary, _ = summaries.get_or_create(auction_id=auction_id)
+        else:
+            # En borrados (incluidos los en cascada) no se crea el resumen
+            summary = summaries.filter(auction_id=auction_id).first()
+            if summary is None:
+                return None
+        summary.count += count_delta
+        summary.total += total_delta
+        summary.average = summary.total / summary.count if summary.count else None
+        summary.save()
+        return summary
+
+
+def compute_rating_summaries():
+    """Agregados reales de las valoraciones por subasta: {auction_id: (count, total)}."""
+    rows = (
+        Rating.objects.order_by()
+        .values('auction_id')
+        .annotate(count=Count('id'), total=Sum('value'))
+    )
+    return {row['auction_id']: (row['count'], row['total']) for row in rows}
+
+
+def find_rating_summary_drift():
+    """
+    Compara los resumenes guardados con los agregados reales.
+    Devuelve una lista de (auction_id, guardado, real) con (count, total).
+    """
+    expected = compute_rating_summaries()
+    stored = {
+        auction_id: (count, total)
+        for auction_id, count, total in RatingSummary.objects.values_list('auction_id', 'count', 'total')
+    }
+    drift = []
+    for auction_id in expected.keys() | stored.keys():
+        actual = expected.get(auction_id, (0, 0))
+        saved = stored.get(auction_id, (0, 0))
+        if actual != saved:
+            drift.append((auction_id, saved, actual))
+    return sorted(drift)
+
+
+@transaction.atomic
+def rebuild_rating_summaries():
+    """Reconstruye desde cero todos los resumenes de valoraciones."""
+    expected = compute_rating_summaries()
+    RatingSummary.objects.all().delete()
+    RatingSummary.objects.bulk_create(
+        [
+            RatingSummary(auction_id=auction_id, count=count, total=total, average=total / count)
+            for auction_id, (count, total) in expected.items()
+        ],
+        batch_size=1000,
+    )
+    return len(expected)
+
+
+def record_new_bid(bid):
+    """Actualiza de forma incremental la puja mas alta y el numero de pujas."""
+    with transaction.atomic():
+        auctions = Auction.objects.filter(pk=bid.auction_id)
+        auctions.update(bid_count=F('bid_count') + 1, **_touch_fields())
+        auctions.filter(Q(highest_bid__isnull=True) | Q(highest_bid__lt=bid.price)).update(
+            highest_bid=bid.price, highest_bidder_id=bid.bidder_id
+        )
+
+
+def refresh_bid_stats(auction_id):
+    """Recalcula la puja mas alta y el numero de pujas a partir de la tabla de pujas."""
+    bids = Bid.objects.filter(auction_id=auction_id)
+    top = bids.order_by('-price', 'creation_date').values('price', 'bidder_id').first()
+    Auction.objects.filter(pk=auction_id).update(
+        highest_bid=top['price'] if top else None,
+        highest_bidder_id=top['bidder_id'] if top else None,
+        bid_count=bids.count(),
+        **_touch_fields(),
+    )
+
+
+def _touch_fields():
+    return {'version': F('version') + 1, 'last_modified': timezone.now()}
+
+
+def touch_auction(auction_id):
+    """Marca la subasta como modificada (sus pujas, valoraciones o comentarios han cambiado)."""
+    Auction.objects.filter(pk=auction_id).update(**_touch_fields())
+
+
+def touch_auctions(auction_ids):
+    """touch_auction para varias subastas en una sola consulta."""
+    Auction.objects.filter(pk__in=auction_ids).update(**_touch_fields())
+
+
+def minimum_bid(auction):
+    """Precio minimo que debe superar la siguiente puja de la subasta."""
+    if auction.highest_bid is None:
+        return auction.price
+    increment = getattr(settings, 'AUCTION_MIN_BID_INCREMENT', Decimal('0.01'))
+    return auction.highest_bid + increment
+
+
+def _lock_auction(auction_id):
+    try:
+        return Auction.objects.select_for_update().get(pk=auction_id)
+    except Auction.DoesNotExist:
+        raise NotFound("Subasta no encontrada.")
+
+
+def _validate_bid(auction, price):
+    if not auction.is_open:
+        raise ValidationError({"price": "La subasta ya está cerrada."})
+    minimum = minimum_bid(auction)
+    if price < minimum:
+        raise ValidationError({"price": f"La puja debe ser de al menos {minimum}."})
+
+
+def place_bid(auction_id, bidder, price):
+    """
+    Registra una puja bloqueando la fila de la subasta (select_for_update), de
+    modo que las pujas concurrentes se validan y escriben una detras de otra
+    contra la puja mas alta vigente y la fecha de cierre.
+    """
+    with transaction.atomic():
+        auction = _lock_auction(auction_id)
+        _validate_bid(auction, price)
+        if Bid.objects.filter(auction_id=auction.pk, bidder=bidder).exists():
+            raise ValidationError({"price": "Ya has pujado en esta subasta."})
+        bid = Bid.objects.create(auction=auction, bidder=bidder, price=price)
+        # Una puja valida siempre es la nueva puja mas alta
+        auction.refresh_from_db(fields=[*BID_STATS_FIELDS, 'version'])
+        publish_bid(bid, auction)
+        return bid
+
+
+def update_bid(bid, price):
+    """Sube una puja existente con las mismas garantias que place_bid."""
+    with transaction.atomic():
+        auction = _lock_auction(bid.auction_id)
+        _validate_bid(auction, price)
+        bid.price = price
+        bid.save(update_fields=['price'])
+        auction.refresh_from_db(fields=[*BID_STATS_FIELDS, 'version'])
+        publish_bid(bid, auction)
+        return bid
+
+
+def withdraw_bid(bid):
+    """Elimina una puja con la subasta bloqueada mientras se recalculan sus datos."""
+    with transaction.atomic():
+        auction = _lock_auction(bid.auction_id)
+        if not auction.is_open:
+            raise ValidationError({"price": "La subasta ya está cerrada."})
+        bid_id = bid.pk
+        bid.delete()
+        auction.refresh_from_db(fields=[*BID_STATS_FIELDS, 'version'])
+        publish_withdraw(bid_id, auction)
+
+
+def close_auction(auction_id, now=None):
+    """
+    Cierra una subasta vencida: la marca como cerrada y guarda la puja
+    ganadora (la mas alta). Devuelve la subasta, o None si no hay que cerrarla
+    (ya cerrada, borrada o con la fecha de cierre ampliada).
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        auction = Auction.objects.select_for_update().filter(pk=auction_id).first()
+        if auction is None or auction.is_closed or auction.closing_date > now:
+            return None
+        auction.is_closed = True
+        auction.closed_at = now
+        auction.winning_bid = (
+            Bid.objects.filter(auction_id=auction_id).order_by('-price', 'creation_date').first()
+        )
+        # save() y no update(): sube la version y lanza los signals (cache, buscador)
+        auction.save(update_fields=[*CLOSING_FIELDS, 'version', 'last_modified'])
+        return auction
+
+
+def due_auctions(now=None, limit=None):
+    """Ids de las subastas vencidas sin cerrar, por fecha de cierre (indice parcial)."""
+    pending = (
+        Auction.objects.filter(is_closed=False, closing_date__lte=now or timezone.now())
+        .order_by('closing_date', 'id')
+        .values_list('id', flat=True)
+    )
+    return list(pending[:limit] if limit else pending)
+
+
+def close_due_auctions(now=None, batch_size=500):
+    """Cierra todas las subastas vencidas. Devuelve las que se han cerrado."""
+    now = now or timezone.now()
+    closed = []
+    while True:
+        batch = due_auctions(now, batch_size)
+        for auction_id in batch:
+            auction = close_auction(auction_id, now)
+            if auction is not None:
+                closed.append(auction)
+        if len(batch) < batch_size:
+            return closed
@@ -0,0 +1,127 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from .cache import bump_generation
+from .models import Auction, Bid, Category, Comment, Rating
+from .search import SEARCH_FIELDS
+from .services import apply_rating_change, record_new_bid, refresh_bid_stats, touch_auction
+
+
+def _deleting_auction(origin, auction_id):
+    # En el borrado en cascada de una subasta no hace falta mantener sus agregados
+    if isinstance(origin, Auction):
+        return origin.pk == auction_id
+    return isinstance(origin, QuerySet) and origin.model is Auction
+
+
+@receiver(post_save, sender=Rating)
+def rating_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        apply_rating_change(instance.auction_id, 1, instance.value)
+    else:
+        previous = getattr(instance, '_loaded_value', None)
+        if previous is None:
+            previous = instance.value
+        if instance.value != previous:
+            apply_rating_change(instance.auction_id, 0, instance.value - previous)
+    instance._loaded_value = instance.value
+    touch_auction(instance.auction_id)
+
+
+@receiver(post_delete, sender=Rating)
+def rating_deleted(sender, instance, origin=None, **kwargs):
+    if _deleting_auction(origin, instance.auction_id):
+        return
+    apply_rating_change(instance.auction_id, -1, -instance.value, create=False)
+    touch_auction(instance.auction_id)
+
+
+@receiver(post_save, sender=Bid)
+def bid_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        record_new_bid(instance)
+    else:
+        refresh_bid_stats(instance.auction_id)
+
+
+@receiver(post_delete, sender=Bid)
+def bid_deleted(sender, instance, origin=None, **kwargs):
+    if _deleting_auction(origin, instance.auction_id):
+        return
+    refresh_bid_stats(instance.auction_id)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        touch_auction(instance.auction_id)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, origin=None, **kwargs):
+    if not _deleting_auction(origin, instance.auction_id):
+        touch_auction(instance.auction_id)
+
+
+@receiver(pre_save, sender=Auction)
+def auction_version(sender, instance, raw=False, **kwargs):
+    # last_modified se actualiza solo (auto_now); la version se sube al editar
+    if not raw and instance.pk is not None and not instance._state.adding:
+        instance.version += 1
+
+
+@receiver(pre_save, sender=Auction)
+def auction_reopened(sender, instance, raw=False, **kwargs):
+    # Fecha de cierre ampliada en una subasta ya cerrada: vuelve a estar abierta y sin ganadora
+    if not raw and instance.is_closed and instance.closing_date > timezone.now():
+        instance.is_closed = False
+        instance.closed_at = None
+        instance.winning_bid = None
+
+
+# Reconstruccion del buscador en memoria de cada proceso (auctions/search.py)
+@receiver(post_save, sender=Auction)
+def auction_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    if update_fields is None or not SEARCH_FIELDS.isdisjoint(update_fields):
+        bump_generation('search')
+
+
+@receiver(post_delete, sender=Auction)
+def auction_deleted(sender, instance, **kwargs):
+    bump_generation('search')
+
+
+# Invalidacion de la cache de listados (auctions/cache.py)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, **kwargs):
+    bump_generation('categories')
+
+
+@receiver(post_save, sender=Auction)
+def auction_category_counts(sender, instance, created, raw=False, **kwargs):
+    # Recuentos del listado de categorias: altas, cambios de categoria y cierres
+    state = (instance.category_id, instance.is_closed)
+    if created or raw or getattr(instance, '_loaded_category_state', None) != state:
+        bump_generation('categories')
+    instance._loaded_category_state = state
+
+
+@receiver(post_delete, sender=Auction)
+def auction_category_deleted(sender, **kwargs):
+    bump_generation('categories')
+
+
+@receiver(post_save, sender=Auction)
+@receiver(post_delete, sender=Auction)
+@receiver(post_save, sender=Bid)
+@receiver(post_delete, sender=Bid)
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+def auction_listing_changed(sender, **kwargs):
+    bump_generation('auctions')
@@ -0,0 +1,38 @@
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class StreamingListMixin:
+    """
+    Anade a una vista de listado el modo ``?stream=true``: devuelve todos los
+    elementos como un array JSON en streaming, leyendo la BD con ``.iterator()``
+    y serializando por bloques, de modo que la memoria no crece con el numero
+    de filas. Sin el parametro se comporta como el listado paginado normal.
+    """
+    stream_query_param = 'stream'
+    stream_chunk_size = 500
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get(self.stream_query_param, '').lower() in ('1', 'true'):
+            queryset = self.filter_queryset(self.get_queryset())
+            return StreamingHttpResponse(self.stream_rows(queryset), content_type='application/json')
+        return super().list(request, *args, **kwargs)
+
+    def stream_rows(self, queryset):
+        encoder = JSONEncoder()
+        separator = '['
+        chunk = []
+        for obj in queryset.iterator(chunk_size=self.stream_chunk_size):
+            chunk.append(obj)
+            if len(chunk) == self.stream_chunk_size:
+                yield separator + self._encode(encoder, chunk)
+                separator = ','
+                chunk = []
+        if chunk:
+            yield separator + self._encode(encoder, chunk)
+            separator = ','
+        yield ']' if separator == ',' else '[]'
+
+    def _encode(self, encoder, chunk):
+        data = self.get_serializer(chunk, many=True).data
+        return ','.join(encoder.encode(item) for item in data)
@@ -1,3 +1,667 @@
-from django.test import TestCase
+import asyncio
+import io
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import OperationalError, connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import Cursor
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from users.models import CustomUser
+from . import realtime
+from .fast_serializers import RowSerializer, comparison_cases
+from .ingest import BidIngest
+from .models import Auction, Bid, Category, RatingSummary
+from .pagination import KeysetPagination
+from .search import InvertedIndex, search_index
+from .seeding import seed_dataset
+from .services import close_auction, place_bid, update_bid, withdraw_bid
+
+# Listados con varias paginas llenas: si el numero de consultas dependiera de
+# las filas (N+1) seria mayor que el esperado
+PAGE_ROWS = 3 * settings.REST_FRAMEWORK['PAGE_SIZE']
+DUMMY_CACHES = {**settings.CACHES, 'no-cache': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+def create_user(username, **extra):
+    return CustomUser.objects.create_user(
+        username=username, email=f'{username}@example.com', password='pass-1234',
+        birth_date=date(1990, 1, 1), **extra,
+    )
+
+
+def create_auction(auctioneer, category, **extra):
+    fields = {
+        'title': 'Jamon iberico', 'description': 'de bellota', 'price': 10, 'stock': 1,
+        'brand': 'Joselito', 'thumbnail': 'http://example.com/a.png',
+        'closing_date': timezone.now() + timedelta(days=20),
+    }
+    fields.update(extra)
+    return Auction.objects.create(auctioneer=auctioneer, category=category, **fields)
+
+
+class AuctionFilterValidationTests(TestCase):
+    urls = ('/api/auctions/', '/api/auctions/async/')
+
+    @classmethod
+    def setUpTestData(cls):
+        create_auction(create_user('alice'), Category.objects.create(name='Jamones'))
+
+    def assertRejected(self, query, param):
+        for url in self.urls:
+            with self.subTest(url=url, query=query):
+                response = self.client.get(f'{url}?{query}')
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(param, response.json())
+
+    def test_non_finite_numbers_are_rejected(self):
+        self.assertRejected('price_min=NaN', 'price_min')
+        self.assertRejected('price_max=Infinity', 'price_max')
+        self.assertRejected('price_min=sNaN', 'price_min')
+        self.assertRejected('min_rating=nan', 'min_rating')
+
+    def test_out_of_range_ids_are_rejected(self):
+        self.assertRejected('category=99999999999999999999999', 'category')
+        self.assertRejected(f'auctioneer={2 ** 63}', 'auctioneer')
+        self.assertRejected('category=0', 'category')
+        self.assertRejected('auctioneer=-1', 'auctioneer')
+
+    def test_valid_filters_are_accepted(self):
+        for url in self.urls:
+            response = self.client.get(f'{url}?price_min=5&price_max=20&category=1,2')
+            self.assertEqual(response.status_code, 200)
+
+
+class ListCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.auction = create_auction(create_user('alice'), Category.objects.create(name='Jamones'))
+
+    def test_local_memory_cache_is_not_used(self):
+        # LocMemCache (la de por defecto) no se comparte entre workers
+        for _ in range(2):
+            self.assertNotIn('X-Cache', self.client.get('/api/auctions/'))
+
+    def test_shared_cache_is_invalidated_after_commit(self):
+        backend = 'django.core.cache.backends.filebased.FileBasedCache'
+        with tempfile.TemporaryDirectory() as location, \
+                override_settings(CACHES={'default': {'BACKEND': backend, 'LOCATION': location}}):
+            self.assertEqual(self.client.get('/api/auctions/')['X-Cache'], 'MISS')
+            self.assertEqual(self.client.get('/api/auctions/')['X-Cache'], 'HIT')
+            with self.captureOnCommitCallbacks(execute=True):
+                self.auction.title = 'Paleta iberica'
+                self.auction.save()
+            response = self.client.get('/api/auctions/')
+            self.assertEqual(response['X-Cache'], 'MISS')
+            self.assertEqual(response.json()['results'][0]['title'], 'Paleta iberica')
+
+
+class RatingSummaryTests(TestCase):
+    def setUp(self):
+        self.auction = create_auction(create_user('alice'), Category.objects.create(name='Jamones'))
+        self.url = f'/api/auctions/{self.auction.pk}/'
+        self.clients = []
+        for username in ('bob', 'carol'):
+            client = APIClient()
+            client.force_authenticate(create_user(username))
+            self.clients.append(client)
+
+    def assertSummary(self, count, total, average):
+        summary = RatingSummary.objects.get(auction=self.auction)
+        self.assertEqual((summary.count, summary.total, summary.average), (count, total, average))
+
+    def test_create_edit_and_delete_update_the_summary(self):
+        bob, carol = self.clients
+        self.assertEqual(bob.post(f'{self.url}ratings/', {'value': 4}).status_code, 201)
+        self.assertEqual(carol.post(f'{self.url}ratings/', {'value': 1}).status_code, 201)
+        self.assertSummary(2, 5, 2.5)
+
+        self.assertEqual(carol.patch(f'{self.url}my_rating/', {'value': 5}).status_code, 200)
+        self.assertSummary(2, 9, 4.5)
+
+        self.assertEqual(bob.delete(f'{self.url}my_rating/').status_code, 204)
+        self.assertSummary(1, 5, 5.0)
+        self.assertEqual(self.client.get(self.url).json()['average_rating'], 5.0)
+
+        self.assertEqual(carol.delete(f'{self.url}my_rating/').status_code, 204)
+        self.assertSummary(0, 0, None)
+
+    def test_check_detects_and_rebuild_fixes_drift(self):
+        self.clients[0].post(f'{self.url}ratings/', {'value': 4})
+        call_command('rebuild_rating_summaries', check=True, stdout=io.StringIO())
+
+        RatingSummary.objects.filter(auction=self.auction).update(count=7, total=30, average=30 / 7)
+        with self.assertRaises(CommandError):
+            call_command('rebuild_rating_summaries', check=True, stdout=io.StringIO())
+
+        call_command('rebuild_rating_summaries', stdout=io.StringIO())
+        self.assertSummary(1, 4, 4.0)
+        call_command('rebuild_rating_summaries', check=True, stdout=io.StringIO())
+
+
+class BidStatsTests(TestCase):
+    def setUp(self):
+        self.auction = create_auction(create_user('alice'), Category.objects.create(name='Jamones'), price=10)
+        self.url = f'/api/auctions/{self.auction.pk}/'
+        self.users, self.clients = [], []
+        for username in ('bob', 'carol'):
+            user = create_user(username)
+            client = APIClient()
+            client.force_authenticate(user)
+            self.users.append(user)
+            self.clients.append(client)
+
+    def assertStats(self, highest_bid, highest_bidder, bid_count):
+        auction = Auction.objects.get(pk=self.auction.pk)
+        self.assertEqual(
+            (auction.highest_bid, auction.highest_bidder, auction.bid_count),
+            (highest_bid, highest_bidder, bid_count),
+        )
+
+    def test_create_edit_and_delete_update_the_stats(self):
+        bob, carol = self.clients
+        self.assertEqual(bob.post(f'{self.url}bids/', {'price': '20.00'}).status_code, 201)
+        self.assertStats(Decimal('20.00'), self.users[0], 1)
+        self.assertEqual(carol.post(f'{self.url}bids/', {'price': '25.00'}).status_code, 201)
+        self.assertStats(Decimal('25.00'), self.users[1], 2)
+
+        self.assertEqual(bob.patch(f'{self.url}my_bid/', {'price': '30.00'}).status_code, 200)
+        self.assertStats(Decimal('30.00'), self.users[0], 2)
+
+        self.assertEqual(bob.delete(f'{self.url}my_bid/').status_code, 204)
+        self.assertStats(Decimal('25.00'), self.users[1], 1)
+        listed = self.client.get('/api/auctions/').json()['results'][0]
+        self.assertEqual((listed['highest_bid'], listed['bid_count']), ('25.00', 1))
+
+        self.assertEqual(carol.delete(f'{self.url}my_bid/').status_code, 204)
+        self.assertStats(None, None, 0)
+
+    def test_rejected_bids_do_not_change_the_stats(self):
+        bob, carol = self.clients
+        bob.post(f'{self.url}bids/', {'price': '20.00'})
+        self.assertEqual(carol.post(f'{self.url}bids/', {'price': '15.00'}).status_code, 400)
+        self.assertStats(Decimal('20.00'), self.users[0], 1)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.owner = create_user('alice')
+        self.auction = create_auction(self.owner, Category.objects.create(name='Jamones'))
+        self.url = f'/api/auctions/{self.auction.pk}/'
+        self.urls = [self.url, f'{self.url}bids/', f'{self.url}ratings/', f'{self.url}comments/']
+
+    def etags(self):
+        etags = {}
+        for url in self.urls:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            etags[url] = response['ETag']
+        return etags
+
+    def assertStatuses(self, etags, expected):
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, expected)
+
+    def test_unchanged_auction_is_not_modified(self):
+        self.assertStatuses(self.etags(), 304)
+        response = self.client.get(self.url)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+
+    def test_bids_ratings_and_comments_change_the_etag(self):
+        client = APIClient()
+        client.force_authenticate(create_user('bob'))
+        writes = [
+            lambda: place_bid(self.auction.pk, create_user('carol'), Decimal('20.00')),
+            lambda: client.post(f'{self.url}ratings/', {'value': 4}),
+            lambda: client.post(f'{self.url}comments/', {'title': 'Muy bueno', 'text': 'Recomendable'}),
+        ]
+        for write in writes:
+            etags = self.etags()
+            result = write()
+            if hasattr(result, 'status_code'):
+                self.assertEqual(result.status_code, 201)
+            self.assertStatuses(etags, 200)
+
+    def test_closing_changes_the_etag(self):
+        etags = self.etags()
+        Auction.objects.filter(pk=self.auction.pk).update(closing_date=timezone.now() - timedelta(seconds=1))
+        self.assertStatuses(etags, 200)
+
+    def test_missing_auction_is_not_found(self):
+        self.assertEqual(self.client.get('/api/auctions/999999/', HTTP_IF_NONE_MATCH='"x"').status_code, 404)
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        alice = create_user('alice')
+        category = Category.objects.create(name='Jamones')
+        # Muchas subastas con el mismo bid_count y precio: el orden solo se decide por id
+        for index in range(23):
+            create_auction(alice, category, price=10 if index % 2 else 20)
+
+    def pages(self, url, key='next'):
+        pages = []
+        while url:
+            data = self.client.get(url).json()
+            pages.append([auction['id'] for auction in data['results']])
+            url = data[key]
+            self.assertLess(len(pages), 20)
+        return pages
+
+    def test_ties_are_paged_without_repeats(self):
+        for ordering, key in (('bid_count', lambda a: (a.bid_count, a.pk)),
+                              ('-bid_count', lambda a: (-a.bid_count, -a.pk)),
+                              ('-price', lambda a: (-a.price, -a.pk))):
+            with self.subTest(ordering=ordering):
+                pages = self.pages(f'/api/auctions/?pagination=cursor&ordering={ordering}')
+                expected = [auction.pk for auction in sorted(Auction.objects.all(), key=key)]
+                self.assertEqual(sum(pages, []), expected)
+
+    def test_previous_links_walk_back(self):
+        url = '/api/auctions/?pagination=cursor&ordering=-price'
+        forward = self.pages(url)
+        data = self.client.get(url).json()
+        while data['next']:
+            data = self.client.get(data['next']).json()
+        backward = self.pages(data['previous'], key='previous')
+        self.assertEqual(backward[::-1], forward[:-1])
+
+    def test_cursor_past_the_end_is_an_empty_page(self):
+        last = Auction.objects.order_by('id').last()
+        paginator = KeysetPagination()
+        paginator.base_url = 'http://testserver/api/auctions/'
+        paginator.ordering = ('id',)
+        cursor = paginator.encode_cursor(Cursor(offset=0, reverse=False, position=paginator._position(last)))
+        data = self.client.get(cursor).json()
+        self.assertEqual(data['results'], [])
+        self.assertIsNone(data['next'])
+        # El enlace anterior vuelve a las filas anteriores a la posicion del cursor
+        previous = self.client.get(data['previous']).json()
+        ids = list(Auction.objects.filter(pk__lt=last.pk).order_by('-id').values_list('id', flat=True))
+        self.assertEqual([auction['id'] for auction in previous['results']], ids[:settings.REST_FRAMEWORK['PAGE_SIZE']][::-1])
+        self.assertEqual([auction['id'] for auction in self.client.get(previous['next']).json()['results']], [last.pk])
+
+    def test_cursor_on_an_empty_sub_resource(self):
+        auction = Auction.objects.first()
+        url = f'/api/auctions/{auction.pk}/comments/?pagination=cursor&cursor=cD1bIjEiXQ%3D%3D'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [])
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get('/api/auctions/?pagination=cursor&cursor=cD1bImFiYyJd')
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(CACHES=DUMMY_CACHES, API_CACHE_ALIAS='no-cache', AUCTION_SEARCH_MAX_RESULTS=4)
+class AuctionSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        alice = create_user('alice')
+        category = Category.objects.create(name='Jamones')
+        for index in range(6):
+            create_auction(alice, category, title=f'Jamon {index}')
+        create_auction(alice, category, title='Lomo')
+
+    def setUp(self):
+        search_index.invalidate()
+
+    def test_limit_applies_after_filters(self):
+        category = Category.objects.create(name='Embutidos')
+        special = create_auction(Auction.objects.first().auctioneer, category, title='Jamon special')
+        search_index.invalidate()
+        for url in ('/api/auctions/', '/api/auctions/async/'):
+            with self.subTest(url=url):
+                data = self.client.get(f'{url}?search=jamon&category={category.pk}').json()
+                self.assertEqual([auction['id'] for auction in data['results']], [special.pk])
+                self.assertNotIn('search_truncated', data)
+
+    def test_truncated_results_are_reported(self):
+        for url in ('/api/auctions/', '/api/auctions/async/'):
+            with self.subTest(url=url):
+                data = self.client.get(f'{url}?search=jamon').json()
+                self.assertEqual(data['count'], 4)
+                self.assertIs(data['search_truncated'], True)
+                data = self.client.get(f'{url}?search=lomo').json()
+                self.assertEqual(data['count'], 1)
+                self.assertNotIn('search_truncated', data)
+
+    @override_settings(CACHES={**settings.CACHES, 'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'search-tests',
+    }}, API_CACHE_ALIAS='shared')
+    def test_other_process_index_is_rebuilt_after_commit(self):
+        # Otro proceso: su propio indice, la misma cache
+        other = InvertedIndex()
+        self.assertEqual(len(other.search('jamon')), 6)
+        with self.captureOnCommitCallbacks(execute=True):
+            auction = Auction.objects.get(title='Lomo')
+            auction.title = 'Jamon de lomo'
+            auction.save()
+        self.assertEqual(len(other.search('jamon')), 7)
+
+    def test_index_is_rebuilt_after_ttl(self):
+        other = InvertedIndex()
+        self.assertEqual(len(other.search('lomo')), 1)
+        Auction.objects.filter(title='Lomo').update(title='Cecina')
+        self.assertEqual(len(other.search('lomo')), 1)
+        with override_settings(AUCTION_SEARCH_INDEX_TTL=0):
+            self.assertEqual(other.search('lomo'), {})
+
+
+class ClosedAuctionTests(TestCase):
+    def setUp(self):
+        self.owner = create_user('alice')
+        self.bidder = create_user('bob')
+        self.auction = create_auction(self.owner, Category.objects.create(name='Jamones'))
+        self.bid = place_bid(self.auction.pk, self.bidder, Decimal('20.00'))
+        Auction.objects.filter(pk=self.auction.pk).update(closing_date=timezone.now() - timedelta(hours=1))
+        close_auction(self.auction.pk)
+
+    def test_extending_closing_date_reopens(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        closing_date = timezone.now() + timedelta(days=30)
+        response = client.patch(f'/api/auctions/{self.auction.pk}/', {'closing_date': closing_date.isoformat()})
+        self.assertEqual(response.status_code, 200)
+        auction = Auction.objects.get(pk=self.auction.pk)
+        self.assertFalse(auction.is_closed)
+        self.assertIsNone(auction.closed_at)
+        self.assertIsNone(auction.winning_bid)
+        self.assertTrue(auction.is_open)
+        # Las pujas y sus agregados se conservan
+        self.assertEqual(auction.highest_bid, self.bid.price)
+        self.assertEqual(auction.bid_count, 1)
+
+    def test_bid_ingest_rejects_closed_auctions(self):
+        other = create_user('carol')
+        results, created = BidIngest([{'auction': self.auction.pk, 'bidder': other.pk, 'price': '30.00'}]).run()
+        self.assertEqual(created, 0)
+        self.assertEqual(results[0]['errors'], {'auction': ['La subasta esta cerrada.']})
+        self.assertEqual(Bid.objects.filter(auction=self.auction).count(), 1)
+
+
+class BulkIngestTests(TestCase):
+    def test_out_of_range_ids_are_reported_per_item(self):
+        # Un id fuera de rango no hace fallar al resto del lote
+        auction = create_auction(create_user('alice'), Category.objects.create(name='Jamones'))
+        items = [
+            {'auction': auction.pk, 'bidder': 2 ** 70, 'price': '30.00'},
+            {'auction': -1, 'bidder': create_user('bob').pk, 'price': '30.00'},
+            {'auction': auction.pk, 'bidder': create_user('carol').pk, 'price': '30.00'},
+        ]
+        results, created = BidIngest(items).run()
+        self.assertEqual(created, 1)
+        self.assertEqual(results[0]['errors'], {'bidder': ['Id fuera de rango.']})
+        self.assertEqual(results[1]['errors'], {'auction': ['Id fuera de rango.']})
+        self.assertIn('id', results[2])
+
+
+class RowSerializerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_dataset(users=8, categories=2, auctions=12, bids_per_auction=4,
+                     ratings_per_auction=2, comments_per_auction=2, seed=0)
+        # Nulos y decimales sin ceros a la derecha en ambos caminos
+        create_auction(create_user('alice'), Category.objects.first(), price=Decimal('7.5'))
+
+    def test_output_is_byte_identical_to_drf(self):
+        renderer = JSONRenderer()
+        for label, queryset, request, drf_class, row_class in comparison_cases():
+            with self.subTest(label):
+                expected = drf_class(list(queryset), many=True, context={'request': request}).data
+                serializer = row_class(request)
+                rows = serializer.serialize(list(serializer.values(queryset)))
+                self.assertTrue(expected)
+                self.assertEqual(renderer.render(rows), renderer.render(expected))
+
+    def test_base_class_is_abstract(self):
+        with self.assertRaises(TypeError):
+            RowSerializer()
+
+
+class ConcurrentBidTests(TransactionTestCase):
+    """
+    Pujas concurrentes contra una misma subasta: el estado final debe ser
+    consistente. En SQLite select_for_update no hace nada y las escrituras se
+    serializan con el bloqueo de la base de datos; el bloqueo de fila de
+    place_bid solo se comprueba en motores que lo soportan (PostgreSQL).
+    """
+    bidders = 300
+    threads = 16
+    retries = 100
+
+    def setUp(self):
+        owner = create_user('owner')
+        self.users = CustomUser.objects.bulk_create([
+            CustomUser(username=f'bidder-{index}', birth_date=date(1990, 1, 1), password='!')
+            for index in range(self.bidders)
+        ])
+        self.auction = create_auction(owner, Category.objects.create(name='Jamones'), price=Decimal('1.00'))
+
+    def fire(self):
+        counters = {'accepted': 0, 'rejected': 0, 'failed': 0}
+        lock = threading.Lock()
+        gate = threading.Event()
+        rng = random.Random(0)
+        prices = [Decimal(100 + index * 100 + rng.randint(-500, 500)) / 100 for index in range(self.bidders)]
+
+        def bid(user, price):
+            gate.wait()
+            outcome = 'failed'
+            try:
+                for attempt in range(self.retries + 1):
+                    try:
+                        place_bid(self.auction.pk, user, price)
+                        outcome = 'accepted'
+                        break
+                    except ValidationError:
+                        # Precios crecientes con ruido: muchas pujas compiten por muy poco
+                        outcome = 'rejected'
+                        break
+                    except OperationalError:
+                        # SQLite bloqueada por otra escritura
+                        time.sleep(0.01 * (attempt + 1))
+            finally:
+                connection.close()
+            with lock:
+                counters[outcome] += 1
+
+        with ThreadPoolExecutor(max_workers=self.threads) as pool:
+            futures = [pool.submit(bid, user, price) for user, price in zip(self.users, prices)]
+            gate.set()
+            for future in futures:
+                future.result()
+        return counters
+
+    def test_final_state_is_consistent(self):
+        counters = self.fire()
+        auction = Auction.objects.get(pk=self.auction.pk)
+        bids = list(Bid.objects.filter(auction=auction).order_by('id'))
+
+        self.assertEqual(counters['failed'], 0)
+        self.assertEqual(len(bids), counters['accepted'])
+        self.assertEqual(auction.bid_count, len(bids))
+        # Cada puja aceptada supera a la anterior: los precios crecen en orden de escritura
+        for previous, current in zip(bids, bids[1:]):
+            self.assertGreater(current.price, previous.price)
+        self.assertEqual(auction.highest_bid, bids[-1].price)
+        self.assertEqual(auction.highest_bidder_id, bids[-1].bidder_id)
+
+    @skipUnlessDBFeature('has_select_for_update')
+    def test_place_bid_waits_for_the_row_lock(self):
+        locked, release = threading.Event(), threading.Event()
+
+        def hold_lock():
+            try:
+                with transaction.atomic():
+                    Auction.objects.select_for_update().get(pk=self.auction.pk)
+                    locked.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        def bid():
+            try:
+                return place_bid(self.auction.pk, self.users[0], Decimal('5.00'))
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            holder = pool.submit(hold_lock)
+            self.assertTrue(locked.wait(10))
+            bidding = pool.submit(bid)
+            # Mientras otra transaccion tiene la fila bloqueada, la puja espera
+            with self.assertRaises(TimeoutError):
+                bidding.result(timeout=0.5)
+            release.set()
+            holder.result(timeout=10)
+            self.assertEqual(bidding.result(timeout=10).price, Decimal('5.00'))
+
+
+# Sin cache de respuestas: un acierto contaria 0 consultas
+@override_settings(CACHES=DUMMY_CACHES, API_CACHE_ALIAS='no-cache')
+class QueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        data = seed_dataset(
+            users=PAGE_ROWS, categories=2, auctions=PAGE_ROWS, bids_per_auction=PAGE_ROWS,
+            ratings_per_auction=PAGE_ROWS, comments_per_auction=PAGE_ROWS, seed=0,
+        )
+        cls.auction = data['auctions'][0]
+        cls.auctioneer = cls.auction.auctioneer
+        cls.bidder = data['bids'][0].bidder
+
+    def assertQueries(self, cases, user=None):
+        client = APIClient()
+        client.force_authenticate(user)
+        for url, expected in cases:
+            with self.subTest(url=url), self.assertNumQueries(expected):
+                response = client.get(url)
+                # Los listados en streaming consultan mientras se consume la respuesta
+                b''.join(response.streaming_content) if response.streaming else response.content
+                self.assertEqual(response.status_code, 200)
+
+    def test_auction_endpoints(self):
+        pk = self.auction.pk
+        self.assertQueries([
+            ('/api/auctions/', 2),
+            ('/api/auctions/?expand=auctioneer', 2),
+            ('/api/auctions/?pagination=cursor', 1),
+            ('/api/auctions/?isOpen=true&min_rating=1&ordering=-bid_count&facets=true', 3),
+            (f'/api/auctions/{pk}/', 2),
+            (f'/api/auctions/{pk}/?expand=auctioneer', 2),
+            ('/api/auctions/categories/', 2),
+        ])
+
+    def test_auction_sub_resources(self):
+        pk = self.auction.pk
+        self.assertQueries([
+            (f'/api/auctions/{pk}/bids/', 3),
+            (f'/api/auctions/{pk}/bids/?pagination=cursor', 2),
+            (f'/api/auctions/{pk}/ratings/', 3),
+            (f'/api/auctions/{pk}/comments/', 3),
+        ])
+
+    def test_user_lists(self):
+        self.assertQueries([
+            ('/api/auctions/user_auctions/', 2),
+            ('/api/auctions/user_auctions/?stream=true', 1),
+        ], user=self.auctioneer)
+        self.assertQueries([
+            ('/api/auctions/user_bids/', 2),
+            ('/api/auctions/user_bids/?stream=true', 1),
+            (f'/api/auctions/{self.auction.pk}/my_bid/', 1),
+        ], user=self.bidder)
+
+    def test_async_endpoints(self):
+        pk = self.auction.pk
+        self.assertQueries([
+            ('/api/auctions/async/?expand=auctioneer', 2),
+            (f'/api/auctions/async/{pk}/', 1),
+            (f'/api/auctions/async/{pk}/bids/', 2),
+            (f'/api/auctions/async/{pk}/ratings/', 2),
+            (f'/api/auctions/async/{pk}/comments/', 2),
+        ])
+
+
+class BidStreamTests(TransactionTestCase):
+    def setUp(self):
+        self.auction = create_auction(create_user('alice'), Category.objects.create(name='Jamones'))
+        self.bid = place_bid(self.auction.pk, create_user('bob'), Decimal('20.00'))
+
+    def test_bids_around_the_snapshot_are_sent_once(self):
+        broadcaster = realtime.get_broadcaster()
+        snapshot = realtime._auction_snapshot
+
+        def racing_snapshot(auction_id):
+            # Un mensaje que el estado ya incluye y otro confirmado justo despues
+            version = Auction.objects.get(pk=auction_id).version
+            broadcaster.publish(auction_id, {'type': 'bid', 'version': version})
+            data = snapshot(auction_id)
+            broadcaster.publish(auction_id, {'type': 'bid', 'version': version + 1})
+            return data
+
+        version = Auction.objects.get(pk=self.auction.pk).version
+        self.assertEqual(self.stream(racing_snapshot), ['snapshot', f'bid {version + 1}'])
+
+    def test_raising_an_existing_bid_is_sent(self):
+        snapshot = realtime._auction_snapshot
+
+        def snapshot_then_raise(auction_id):
+            data = snapshot(auction_id)
+            update_bid(self.bid, Decimal('30.00'))
+            return data
+
+        events = self.stream(snapshot_then_raise)
+        self.assertEqual(events, ['snapshot', f'bid {Auction.objects.get(pk=self.auction.pk).version}'])
+
+    def test_withdrawing_a_bid_is_sent(self):
+        snapshot = realtime._auction_snapshot
+
+        def snapshot_then_withdraw(auction_id):
+            data = snapshot(auction_id)
+            withdraw_bid(self.bid)
+            return data
+
+        events = self.stream(snapshot_then_withdraw)
+        self.assertEqual(events, ['snapshot', f'withdraw {Auction.objects.get(pk=self.auction.pk).version}'])
+
+    def stream(self, snapshot):
+        events = []
+
+        async def run():
+            done = asyncio.Event()
+
+            async def receive():
+                await done.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                lines = message.get('body', b'').decode().split('\n')
+                if lines[0] == 'event: snapshot':
+                    events.append('snapshot')
+                elif lines[0].startswith('event: '):
+                    events.append(lines[0].removeprefix('event: ') + ' ' + lines[1].removeprefix('id: '))
+                    done.set()
+
+            await asyncio.wait_for(realtime.bid_stream({'method': 'GET'}, receive, send, self.auction.pk), 5)
+
+        with mock.patch.object(realtime, '_auction_snapshot', snapshot):
+            async_to_sync(run)()
+        return events
@@ -1,4 +1,5 @@
 from django.urls import path
+from . import async_views
 from .views import (
     CategoryListCreate,
     CategoryRetrieveUpdateDestroy,
@@ -12,6 +13,9 @@ from .views import (
     RatingRetrieveUpdateDestroy,
     CommentListCreateView,
     CommentRetrieveUpdateDestroy,
+    BulkBidCreate,
+    BulkRatingCreate,
+    BulkCommentCreate,
 )
 
 app_name = "auctions"
@@ -32,5 +36,15 @@ urlpatterns = [
     path('<int:auction_id>/my_rating/', RatingRetrieveUpdateDestroy.as_view(), name='my-rating-auction'),
     path('<int:auction_id>/comments/', CommentListCreateView.as_view(), name='comment-list-create'),
     path('<int:auction_id>/my_comment/', CommentRetrieveUpdateDestroy.as_view(), name='my-comment-auction'),
+    # Altas masivas (administradores)
+    path('bulk/bids/', BulkBidCreate.as_view(), name='bulk-bid-create'),
+    path('bulk/ratings/', BulkRatingCreate.as_view(), name='bulk-rating-create'),
+    path('bulk/comments/', BulkCommentCreate.as_view(), name='bulk-comment-create'),
+    # Variantes asincronas de solo lectura (ASGI)
+    path('async/', async_views.auction_list, name='async-auction-list'),
+    path('async/<int:pk>/', async_views.auction_detail, name='async-auction-detail'),
+    path('async/<int:auction_id>/bids/', async_views.bid_list, name='async-bid-list'),
+    path('async/<int:auction_id>/ratings/', async_views.rating_list, name='async-rating-list'),
+    path('async/<int:auction_id>/comments/', async_views.comment_list, name='async-comment-list'),
 ]
 
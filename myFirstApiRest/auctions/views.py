@@ -1,7 +1,8 @@
-from rest_framework import generics
+from rest_framework import generics, status
 from .models import Category, Auction, Bid, Rating, Comment
 from .serializers import (
     CategoryListCreateSerializer,
+    CategoryCountsSerializer,
     CategoryDetailSerializer,
     AuctionListCreateSerializer,
     AuctionDetailSerializer,
@@ -11,56 +12,130 @@ from .serializers import (
     RatingDetailSerializer,
     CommentListCreateSerializer,
     CommentDetailSerializer,
+    select_expansions,
 )
-from django.db.models import Q
+from .filters import FacetedListMixin, filter_auctions, order_auctions, requested_ordering
+from django.db import transaction
+from django.utils.decorators import method_decorator
 from rest_framework.response import Response
-from rest_framework.views import APIView
-from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework.exceptions import NotFound
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from rest_framework.exceptions import NotFound, ValidationError
+from .cache import CachedListMixin
+from .conditional import auction_condition
+from .fast_serializers import (
+    AuctionListRowSerializer,
+    BidListRowSerializer,
+    CommentListRowSerializer,
+    RowListMixin,
+)
+from .ingest import BidIngest, CommentIngest, RatingIngest
+from .pagination import PageOrCursorPagination
 from .permissions import IsOwnerOrAdmin
+from .search import search_auctions
+from .streaming import StreamingListMixin
+from .services import BID_STATS_FIELDS, CLOSING_FIELDS, place_bid, update_bid, withdraw_bid
 
 
-class CategoryListCreate(generics.ListCreateAPIView):
-    queryset = Category.objects.all()
+class CategoryListCreate(CachedListMixin, generics.ListCreateAPIView):
+    # Los recuentos cambian con las subastas: signals.py sube 'categories' al crear,
+    # borrar, cerrar o cambiar de categoria una subasta
+    cache_generations = ('categories',)
     serializer_class = CategoryListCreateSerializer
 
+    def get_queryset(self):
+        if self.request.method == 'GET':
+            # Con GROUP BY Django no aplica Meta.ordering
+            return Category.objects.with_auction_counts().order_by('id')
+        return Category.objects.all()
+
+    def get_serializer_class(self):
+        if self.request.method == 'GET':
+            return CategoryCountsSerializer
+        return CategoryListCreateSerializer
+
 
 class CategoryRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
     queryset = Category.objects.all()
     serializer_class = CategoryDetailSerializer
 
 
-class AuctionListCreate(generics.ListCreateAPIView):
+class AuctionListCreate(CachedListMixin, FacetedListMixin, RowListMixin, generics.ListCreateAPIView):
+    cache_generations = ('auctions',)
     serializer_class = AuctionListCreateSerializer
+    row_serializer_class = AuctionListRowSerializer
+    pagination_class = PageOrCursorPagination
+    search_truncated = False
+
+    @property
+    def cursor_ordering(self):
+        names = requested_ordering(self.request.query_params)
+        if not names:
+            return 'id'
+        # El cursor compara con > y <: no admite columnas con nulos
+        if any(name.lstrip('-') == 'average_rating' for name in names):
+            raise ValidationError({'ordering': ["average_rating no admite paginacion por cursor."]})
+        return (*names, '-id' if names[0].startswith('-') else 'id')
 
     def get_queryset(self): 
-        queryset = Auction.objects.all() 
+        queryset = select_expansions(Auction.objects.with_rating_stats(), self.request)
         params = self.request.query_params 
+        queryset = filter_auctions(queryset, params)
         search = params.get('search', None) 
         if search: 
-            queryset = queryset.filter(Q(title__icontains=search) | Q(description__icontains=search)) 
-        return queryset 
+            # Texto completo ordenado por relevancia (ver auctions/search.py)
+            queryset, self.search_truncated = search_auctions(queryset, search)
+        # Un orden explicito sustituye al de relevancia
+        return order_auctions(queryset, requested_ordering(params))
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.search_truncated:
+            # El buscador en memoria ha descartado las coincidencias menos relevantes
+            response.data['search_truncated'] = True
+        return response
 
     def perform_create(self, serializer):
         # Automatically set auctioneer as the logged-in user
         serializer.save(auctioneer=self.request.user)
 
+@method_decorator(auction_condition, name='get')
 class AuctionRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsOwnerOrAdmin]   
-    queryset = Auction.objects.all()
     serializer_class = AuctionDetailSerializer
 
-class UserAuctionListView(APIView):
+    def get_queryset(self):
+        return select_expansions(Auction.objects.with_rating_stats(), self.request)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        # Bloquea la subasta y relee los datos de pujas, el cierre y la version para
+        # no pisar una puja o un cierre concurrentes. Si la nueva fecha de cierre es
+        # futura, la senal auction_reopened vuelve a abrir la subasta
+        serializer.instance.refresh_from_db(
+            from_queryset=Auction.objects.select_for_update(),
+            fields=[*BID_STATS_FIELDS, *CLOSING_FIELDS, 'version'],
+        )
+        serializer.save()
+
+class UserAuctionListView(StreamingListMixin, RowListMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated]
-    
-    def get(self, request, *args, **kwargs):
+    serializer_class = AuctionListCreateSerializer
+    row_serializer_class = AuctionListRowSerializer
+    pagination_class = PageOrCursorPagination
+    cursor_ordering = 'id'
+
+    def get_queryset(self):
         # Obtener las subastas del usuario autenticado
-        user_auctions = Auction.objects.filter(auctioneer=request.user)
-        serializer = AuctionListCreateSerializer(user_auctions, many=True)
-        return Response(serializer.data)
+        return select_expansions(
+            Auction.objects.filter(auctioneer=self.request.user).with_rating_stats(), self.request
+        )
 
-class BidListCreate(generics.ListCreateAPIView):
+@method_decorator(auction_condition, name='get')
+class BidListCreate(RowListMixin, generics.ListCreateAPIView):
     serializer_class = BidListCreateSerializer
+    row_serializer_class = BidListRowSerializer
+    pagination_class = PageOrCursorPagination
+    cursor_ordering = ('-price', '-id')
 
     def get_permissions(self):
         if self.request.method == 'GET':
@@ -69,12 +144,14 @@ class BidListCreate(generics.ListCreateAPIView):
 
     def get_queryset(self):
         auction_id = self.kwargs['auction_id']
-        return Bid.objects.filter(auction_id=auction_id).order_by('-price')
+        # bidder se serializa como texto: se trae en la misma consulta
+        return Bid.objects.filter(auction_id=auction_id).select_related('bidder').order_by('-price')
 
     def perform_create(self, serializer):
-        auction_id = self.kwargs['auction_id']
-        auction = Auction.objects.get(pk=auction_id)
-        serializer.save(bidder=self.request.user, auction=auction)
+        # Puja con la subasta bloqueada: valida cierre y minimo y actualiza la puja mas alta
+        serializer.instance = place_bid(
+            self.kwargs['auction_id'], self.request.user, serializer.validated_data['price']
+        )
 
 class BidRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = BidDetailSerializer
@@ -82,7 +159,7 @@ class BidRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self):
         auction_id = self.kwargs['auction_id']
-        return Bid.objects.filter(auction_id=auction_id, bidder=self.request.user).order_by('-price')
+        return Bid.objects.filter(auction_id=auction_id, bidder=self.request.user).select_related('bidder').order_by('-price')
 
     def get(self, request, *args, **kwargs):
         obj = self.get_queryset().first()
@@ -98,16 +175,27 @@ class BidRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
         if not obj:
             raise NotFound("No has pujado en esta subasta.")
         return obj
+
+    def perform_update(self, serializer):
+        price = serializer.validated_data.get('price')
+        if price is not None:
+            serializer.instance = update_bid(serializer.instance, price)
+
+    def perform_destroy(self, instance):
+        withdraw_bid(instance)
     
-class UserBidListView(APIView):
+class UserBidListView(StreamingListMixin, RowListMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated]
-    
-    def get(self, request, *args, **kwargs):
+    serializer_class = BidListCreateSerializer
+    row_serializer_class = BidListRowSerializer
+    pagination_class = PageOrCursorPagination
+    cursor_ordering = 'id'
+
+    def get_queryset(self):
         # Obtener las pujas del usuario autenticado
-        user_bids = Bid.objects.filter(bidder=request.user)
-        serializer = BidListCreateSerializer(user_bids, many=True)
-        return Response(serializer.data)
+        return Bid.objects.filter(bidder=self.request.user).select_related('bidder').order_by('price', 'id')
     
+@method_decorator(auction_condition, name='get')
 class RatingListCreateView(generics.ListCreateAPIView):
     serializer_class = RatingListCreateSerializer
 
@@ -118,8 +206,10 @@ class RatingListCreateView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         auction_id = self.kwargs['auction_id']
-        return Rating.objects.filter(auction_id=auction_id)
+        return Rating.objects.filter(auction_id=auction_id).select_related('user')
 
+    # El resumen de valoraciones se actualiza (signals) en la misma transaccion
+    @transaction.atomic
     def perform_create(self, serializer):
         auction_id = self.kwargs['auction_id']
         auction = Auction.objects.get(pk=auction_id)
@@ -131,7 +221,7 @@ class RatingRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self):
         auction_id = self.kwargs['auction_id']
-        return Rating.objects.filter(auction_id=auction_id, user=self.request.user)
+        return Rating.objects.filter(auction_id=auction_id, user=self.request.user).select_related('user')
 
     def get(self, request, *args, **kwargs):
         obj = self.get_queryset().first()
@@ -147,9 +237,21 @@ class RatingRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
         if not obj:
             raise NotFound("No has valorado esta subasta.")
         return obj
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
     
-class CommentListCreateView(generics.ListCreateAPIView):
+@method_decorator(auction_condition, name='get')
+class CommentListCreateView(RowListMixin, generics.ListCreateAPIView):
     serializer_class = CommentListCreateSerializer
+    row_serializer_class = CommentListRowSerializer
+    pagination_class = PageOrCursorPagination
+    cursor_ordering = 'id'
 
     def get_permissions(self):
         if self.request.method == 'GET':
@@ -158,7 +260,7 @@ class CommentListCreateView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         auction_id = self.kwargs['auction_id']
-        return Comment.objects.filter(auction_id=auction_id)
+        return Comment.objects.filter(auction_id=auction_id).select_related('user')
 
     def perform_create(self, serializer):
         auction_id = self.kwargs['auction_id']
@@ -171,7 +273,7 @@ class CommentRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self):
         auction_id = self.kwargs['auction_id']
-        return Comment.objects.filter(auction_id=auction_id, user=self.request.user)
+        return Comment.objects.filter(auction_id=auction_id, user=self.request.user).select_related('user')
 
     def get(self, request, *args, **kwargs):
         obj = self.get_queryset().first()
@@ -186,4 +288,34 @@ class CommentRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
         obj = self.get_queryset().first()
         if not obj:
             raise NotFound("No has comentado en esta subasta.")
-        return obj
\ No newline at end of file
+        return obj
+
+
+class BulkIngestView(generics.GenericAPIView):
+    """
+    Alta masiva (solo administradores): recibe una lista de registros y
+    devuelve el resultado de cada uno (ver ingest.py). 201 si se han creado
+    todos, 207 si solo algunos y 400 si ninguno.
+    """
+    permission_classes = [IsAdminUser]
+    ingest_class = None
+
+    def post(self, request, *args, **kwargs):
+        results, created = self.ingest_class(request.data).run()
+        if created == len(results):
+            code = status.HTTP_201_CREATED
+        else:
+            code = status.HTTP_207_MULTI_STATUS if created else status.HTTP_400_BAD_REQUEST
+        return Response({"created": created, "errors": len(results) - created, "results": results}, status=code)
+
+class BulkBidCreate(BulkIngestView):
+    serializer_class = BidListCreateSerializer
+    ingest_class = BidIngest
+
+class BulkRatingCreate(BulkIngestView):
+    serializer_class = RatingListCreateSerializer
+    ingest_class = RatingIngest
+
+class BulkCommentCreate(BulkIngestView):
+    serializer_class = CommentListCreateSerializer
+    ingest_class = CommentIngest
@@ -13,4 +13,10 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myFirstApiRest.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Importado despues de cargar Django: usa los modelos de auctions
+from auctions.realtime import BidStreamRouter  # noqa: E402
+
+# Stream de pujas en tiempo real (SSE) en /api/auctions/<id>/bids/stream/
+application = BidStreamRouter(django_application)
@@ -0,0 +1,226 @@
+"""
+Instrumentacion por peticion: numero de consultas, tiempo en BD, tiempo de la
+vista, tiempo de renderizado y latencia total, agrupados por nombre de URL
+(``auction-list-create``, ``bid-list-create``...).
+
+Cada respuesta lleva una cabecera ``Server-Timing`` con sus tiempos y las
+ultimas muestras de cada ruta se guardan en memoria del proceso para
+``GET /api/stats/`` (solo administradores), que devuelve percentiles. Los
+mismos datos alimentan las metricas de Prometheus (metrics.py).
+
+Las consultas se cuentan con un ``execute_wrapper`` instalado en cada conexion
+que solo mide cuando hay una peticion en curso (ContextVar, asi que tambien
+funciona con las vistas asincronas, cuyo ORM corre en otro hilo).
+"""
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .metrics import registry
+
+UNRESOLVED = '<unresolved>'
+PHASES = ('queries', 'db_ms', 'view_ms', 'render_ms', 'total_ms')
+PERCENTILES = (50, 90, 99)
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    __slots__ = ('started', 'queries', 'db_time', 'view_started', 'view_db_time', 'view_time',
+                 'render_started', 'render_time')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.view_started = None
+        self.view_db_time = 0.0
+        self.view_time = 0.0
+        self.render_started = None
+        self.render_time = 0.0
+
+    def sample(self, total):
+        return {
+            'queries': self.queries,
+            'db_ms': self.db_time * 1000,
+            # Python de la vista fuera de la BD: sobre todo serializar
+            'view_ms': max(0.0, self.view_time - self.view_db_time) * 1000,
+            'render_ms': self.render_time * 1000,
+            'total_ms': total * 1000,
+        }
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += time.perf_counter() - start
+
+
+def install_query_recorder(connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    install_query_recorder(connection)
+
+
+connection_created.connect(_on_connection_created)
+
+
+class RouteStats:
+    """Ultimas muestras por ruta en colas acotadas (memoria constante)."""
+
+    def __init__(self, samples=None):
+        self.samples = samples or getattr(settings, 'INSTRUMENTATION_SAMPLES', 1000)
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, route, sample):
+        with self._lock:
+            entry = self._routes.get(route)
+            if entry is None:
+                entry = self._routes[route] = {'count': 0, 'samples': deque(maxlen=self.samples)}
+            entry['count'] += 1
+            entry['samples'].append(sample)
+
+    def reset(self):
+        with self._lock:
+            self._routes = {}
+
+    def report(self):
+        with self._lock:
+            routes = {route: (entry['count'], list(entry['samples'])) for route, entry in self._routes.items()}
+        report = {}
+        for route, (count, samples) in sorted(routes.items()):
+            report[route] = {'count': count, 'samples': len(samples)}
+            for phase in PHASES:
+                values = sorted(sample[phase] for sample in samples)
+                report[route][phase] = {
+                    **{f'p{p}': round(percentile(values, p), 3) for p in PERCENTILES},
+                    'max': round(values[-1], 3),
+                }
+        return report
+
+
+def percentile(values, p):
+    # Rango mas cercano sobre una lista ordenada
+    index = max(0, -(-len(values) * p // 100) - 1)
+    return values[min(index, len(values) - 1)]
+
+
+route_stats = RouteStats()
+
+
+def route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return (match.url_name or match.view_name) if match else UNRESOLVED
+
+
+def server_timing(sample):
+    return (
+        f'db;dur={sample["db_ms"]:.1f};desc="{sample["queries"]} queries", '
+        f'view;dur={sample["view_ms"]:.1f}, '
+        f'render;dur={sample["render_ms"]:.1f}, '
+        f'total;dur={sample["total_ms"]:.1f}'
+    )
+
+
+class InstrumentationMiddleware:
+    """
+    Debe ir la primera de MIDDLEWARE para que la latencia total incluya al
+    resto. En las respuestas en streaming solo se mide hasta que empiezan a
+    enviarse.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        # Conexiones abiertas antes de cargar el middleware (p.ej. en comandos)
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+        metrics = self._start(request)
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = self._start(request)
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, metrics)
+
+    def _start(self, request):
+        metrics = RequestMetrics()
+        request._metrics = metrics
+        return metrics
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = request._metrics
+        metrics.view_started = time.perf_counter()
+        metrics.view_db_time = metrics.db_time
+
+    def process_template_response(self, request, response):
+        # Justo antes de renderizar (las Response de DRF son TemplateResponse)
+        metrics = request._metrics
+        self._end_view(metrics)
+        metrics.render_started = time.perf_counter()
+        response.add_post_render_callback(lambda response: self._end_render(metrics))
+        return response
+
+    def _end_view(self, metrics):
+        if metrics.view_started is not None and metrics.render_started is None:
+            metrics.view_time = time.perf_counter() - metrics.view_started
+            metrics.view_db_time = metrics.db_time - metrics.view_db_time
+
+    def _end_render(self, metrics):
+        metrics.render_time = time.perf_counter() - metrics.render_started
+
+    def _finish(self, request, response, metrics):
+        self._end_view(metrics)
+        sample = metrics.sample(time.perf_counter() - metrics.started)
+        route = route_name(request)
+        route_stats.record(route, sample)
+        registry.observe(route, request.method, response.status_code, sample)
+        response['Server-Timing'] = server_timing(sample)
+        return response
+
+
+class RequestStatsView(APIView):
+    """Percentiles de consultas y tiempos por ruta desde el arranque del proceso."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(route_stats.report())
+
+    def delete(self, request):
+        route_stats.reset()
+        return Response(status=204)
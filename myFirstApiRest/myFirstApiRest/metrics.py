@@ -0,0 +1,238 @@
+"""
+Metricas en formato de texto de Prometheus para ``GET /metrics``.
+
+El middleware de instrumentacion (instrumentation.py) llama a ``observe`` en
+cada peticion: contadores de peticiones por vista, metodo y codigo, e
+histogramas de latencia y tiempo en BD por vista. En el camino caliente solo
+se suman numeros en diccionarios del proceso.
+
+Con varios workers de gunicorn cada proceso tiene sus propios contadores: si
+METRICS_MULTIPROC_DIR esta definido, cada worker vuelca los suyos cada
+METRICS_FLUSH_INTERVAL segundos a ``<dir>/metrics-<pid>.json`` y ``/metrics``
+suma los ficheros de todos (los contadores de workers ya terminados se
+conservan; los gauges del pool solo cuentan los de procesos vivos). El
+directorio se debe vaciar al arrancar el servicio.
+"""
+import atexit
+import bisect
+import contextlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+POOL_STATS = ('pool_min', 'pool_max', 'pool_size', 'pool_available', 'requests_waiting')
+
+logger = logging.getLogger(__name__)
+
+
+def _empty_histogram():
+    return {'buckets': [0] * len(BUCKETS), 'sum': 0.0, 'count': 0}
+
+
+def _observe(histogram, value):
+    # Cubeta no acumulada: se acumulan al exportar
+    index = bisect.bisect_left(BUCKETS, value)
+    if index < len(BUCKETS):
+        histogram['buckets'][index] += 1
+    histogram['sum'] += value
+    histogram['count'] += 1
+
+
+def _copy(histogram):
+    return {'buckets': list(histogram['buckets']), 'sum': histogram['sum'], 'count': histogram['count']}
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+        self.requests = {}
+        self.durations = {}
+        self.db_durations = {}
+        self.queries = {}
+        self.connections_created = 0
+
+    def observe(self, view, method, status, sample):
+        with self._lock:
+            key = (view, method, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            _observe(self.durations.setdefault(view, _empty_histogram()), sample['total_ms'] / 1000)
+            _observe(self.db_durations.setdefault(view, _empty_histogram()), sample['db_ms'] / 1000)
+            self.queries[view] = self.queries.get(view, 0) + sample['queries']
+        self._maybe_flush()
+
+    def connection_created(self):
+        with self._lock:
+            self.connections_created += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'pid': os.getpid(),
+                'requests': [[*key, count] for key, count in self.requests.items()],
+                'durations': {view: _copy(histogram) for view, histogram in self.durations.items()},
+                'db_durations': {view: _copy(histogram) for view, histogram in self.db_durations.items()},
+                'queries': dict(self.queries),
+                'connections_created': self.connections_created,
+                'pool': pool_stats(),
+            }
+
+    def _maybe_flush(self):
+        directory = multiprocess_dir()
+        now = time.monotonic()
+        if directory and now - self._last_flush >= getattr(settings, 'METRICS_FLUSH_INTERVAL', 5):
+            self._last_flush = now
+            self.flush(directory)
+
+    def flush(self, directory=None):
+        # Se llama en mitad de las peticiones: un directorio que falta, sin
+        # permisos o lleno se registra, pero nunca hace fallar la peticion
+        directory = directory or multiprocess_dir()
+        if not directory:
+            return
+        snapshot = self.snapshot()
+        path = None
+        try:
+            # Escritura atomica: quien lea nunca ve un fichero a medias
+            fd, path = tempfile.mkstemp(dir=directory, prefix='.metrics-')
+            with os.fdopen(fd, 'w') as file:
+                json.dump(snapshot, file)
+            os.replace(path, os.path.join(directory, f"metrics-{snapshot['pid']}.json"))
+        except OSError:
+            logger.warning("Could not write metrics to %s", directory, exc_info=True)
+            if path is not None:
+                with contextlib.suppress(OSError):
+                    os.unlink(path)
+
+
+registry = MetricsRegistry()
+
+
+def multiprocess_dir():
+    return getattr(settings, 'METRICS_MULTIPROC_DIR', None)
+
+
+def pool_stats():
+    pool = getattr(connections['default'], 'pool', None)
+    if pool is None:
+        return {}
+    stats = pool.get_stats()
+    return {name: stats.get(name, 0) for name in POOL_STATS}
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    registry.connection_created()
+
+
+connection_created.connect(_on_connection_created)
+atexit.register(registry.flush)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def collect():
+    """Instantanea de este proceso sumada a la de los demas workers."""
+    own = registry.snapshot()
+    snapshots = [own]
+    directory = multiprocess_dir()
+    try:
+        names = os.listdir(directory) if directory else []
+    except OSError:
+        logger.warning("Could not read metrics from %s", directory, exc_info=True)
+        names = []
+    for name in names:
+        if not (name.startswith('metrics-') and name.endswith('.json')) or name == f"metrics-{own['pid']}.json":
+            continue
+        try:
+            with open(os.path.join(directory, name)) as file:
+                snapshots.append(json.load(file))
+        except (OSError, ValueError):
+            continue
+
+    merged = {'requests': {}, 'durations': {}, 'db_durations': {}, 'queries': {}, 'connections_created': 0, 'pool': {}}
+    for snapshot in snapshots:
+        for *key, count in snapshot['requests']:
+            merged['requests'][tuple(key)] = merged['requests'].get(tuple(key), 0) + count
+        for field in ('durations', 'db_durations'):
+            for view, histogram in snapshot[field].items():
+                target = merged[field].setdefault(view, _empty_histogram())
+                target['buckets'] = [a + b for a, b in zip(target['buckets'], histogram['buckets'])]
+                target['sum'] += histogram['sum']
+                target['count'] += histogram['count']
+        for view, count in snapshot['queries'].items():
+            merged['queries'][view] = merged['queries'].get(view, 0) + count
+        merged['connections_created'] += snapshot['connections_created']
+        if snapshot is own or _alive(snapshot['pid']):
+            for name, value in snapshot['pool'].items():
+                merged['pool'][name] = merged['pool'].get(name, 0) + value
+    return merged
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _histogram(lines, name, help_text, histograms):
+    lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+    for view, histogram in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip(BUCKETS, histogram['buckets']):
+            cumulative += count
+            lines.append(f'{name}_bucket{_labels(view=view, le=bound)} {cumulative}')
+        lines.append(f'{name}_bucket{_labels(view=view, le="+Inf")} {histogram["count"]}')
+        lines.append(f'{name}_sum{_labels(view=view)} {histogram["sum"]}')
+        lines.append(f'{name}_count{_labels(view=view)} {histogram["count"]}')
+
+
+def render(data):
+    lines = [
+        '# HELP api_requests_total HTTP requests handled, by view, method and status code.',
+        '# TYPE api_requests_total counter',
+    ]
+    for (view, method, status), count in sorted(data['requests'].items()):
+        lines.append(f'api_requests_total{_labels(view=view, method=method, status=status)} {count}')
+
+    _histogram(lines, 'api_request_duration_seconds', 'Request latency by view.', data['durations'])
+    _histogram(lines, 'api_db_duration_seconds', 'Time spent in SQL queries per request, by view.', data['db_durations'])
+
+    lines += ['# HELP api_db_queries_total SQL queries executed, by view.', '# TYPE api_db_queries_total counter']
+    for view, count in sorted(data['queries'].items()):
+        lines.append(f'api_db_queries_total{_labels(view=view)} {count}')
+
+    lines += [
+        '# HELP api_db_connections_created_total New database connections opened.',
+        '# TYPE api_db_connections_created_total counter',
+        f'api_db_connections_created_total {data["connections_created"]}',
+    ]
+    for name, value in sorted(data['pool'].items()):
+        lines += [f'# TYPE api_db_{name} gauge', f'api_db_{name} {value}']
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return HttpResponse(status=401)
+    return HttpResponse(render(collect()), content_type=CONTENT_TYPE)
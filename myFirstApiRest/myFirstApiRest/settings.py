@@ -12,7 +12,10 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 from pathlib import Path
 from datetime import timedelta
+from decimal import Decimal
+import importlib.util
 import os
+import warnings
 import dj_database_url
 from dotenv import load_dotenv
 
@@ -52,6 +55,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'myFirstApiRest.instrumentation.InstrumentationMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.security.SecurityMiddleware',
@@ -88,7 +92,7 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 5,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ),
 
 }
@@ -107,14 +111,39 @@ SIMPLE_JWT = {
     "BLACKLIST_AFTER_ROTATION": True,
 }
 
+# Segundos que CachedJWTAuthentication mantiene en cache el usuario del token
+# (solo con una cache compartida entre workers; con LocMemCache no se cachea)
+JWT_USER_CACHE_TIMEOUT = 60
+
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
 load_dotenv()
 DATABASES = {
-    'default': dj_database_url.config(default=os.getenv("DATABASE_URL"))
+    'default': dj_database_url.config(
+        default=os.getenv("DATABASE_URL"),
+        # Conexiones persistentes: evita abrir una conexion nueva (TLS incluido)
+        # contra el servidor remoto en cada peticion
+        conn_max_age=int(os.getenv("DB_CONN_MAX_AGE", "60")),
+        conn_health_checks=True,
+    )
 }
+
+# Pool de conexiones nativo de Django (psycopg 3 + psycopg_pool), recomendado
+# con ASGI. Sustituye a las conexiones persistentes: Django exige CONN_MAX_AGE = 0
+DB_POOL = os.getenv("DB_POOL", "").lower() in ("1", "true")
+if DB_POOL and DATABASES['default'].get('ENGINE') != 'django.db.backends.postgresql':
+    warnings.warn("DB_POOL is set but the database is not PostgreSQL: connection pooling is disabled.")
+elif DB_POOL and importlib.util.find_spec("psycopg_pool") is None:
+    warnings.warn("DB_POOL is set but psycopg_pool is not installed: connection pooling is disabled.")
+elif DB_POOL:
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+        "timeout": int(os.getenv("DB_POOL_TIMEOUT", "10")),
+    }
 # DATABASES = {
 #     'default': {
 #         'ENGINE': 'django.db.backends.sqlite3',
@@ -124,6 +153,23 @@ DATABASES = {
 
 
 
+# Cache
+# LocMemCache por defecto (un proceso, tests); en produccion CACHE_BACKEND y
+# CACHE_LOCATION permiten una cache compartida, p.ej.
+# django.core.cache.backends.redis.RedisCache con redis://host:6379
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv("CACHE_BACKEND", 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv("CACHE_LOCATION", 'ibericos'),
+    }
+}
+
+# Cache de los listados publicos (auctions/cache.py). Solo se usa si la cache
+# es compartida entre workers: con LocMemCache los listados no se cachean
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = 60
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -169,4 +215,32 @@ CORS_ALLOW_ALL_ORIGINS = True
 
 CORS_ALLOW_CREDENTIALS = True
 
-AUTH_USER_MODEL = 'users.CustomUser'
\ No newline at end of file
+AUTH_USER_MODEL = 'users.CustomUser'
+
+# Incremento minimo entre pujas consecutivas de una subasta
+AUCTION_MIN_BID_INCREMENT = Decimal(os.getenv("AUCTION_MIN_BID_INCREMENT", "0.01"))
+
+# Maximo de resultados del buscador en memoria (motores distintos de PostgreSQL);
+# si se recorta, el listado lo indica con search_truncated
+AUCTION_SEARCH_MAX_RESULTS = 1000
+
+# Segundos maximos que un proceso usa su buscador en memoria sin reconstruirlo
+# (con una cache local, otros workers no ven sus cambios hasta entonces)
+AUCTION_SEARCH_INDEX_TTL = 60
+
+# Registros por peticion en las altas masivas (auctions/ingest.py)
+BULK_INGEST_MAX_ITEMS = 5000
+
+# Broadcaster del stream de pujas (auctions/realtime.py); el de memoria solo
+# reparte mensajes dentro de un mismo proceso
+AUCTION_BROADCAST_BACKEND = 'auctions.realtime.InMemoryBroadcaster'
+AUCTION_STREAM_HEARTBEAT = 15
+
+# Muestras por ruta que guarda la instrumentacion para /api/stats/
+INSTRUMENTATION_SAMPLES = int(os.getenv("INSTRUMENTATION_SAMPLES", "1000"))
+
+# Metricas de Prometheus (/metrics). Con varios workers, directorio compartido
+# donde cada proceso vuelca sus contadores; METRICS_TOKEN exige un Bearer
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR") or None
+METRICS_FLUSH_INTERVAL = 5
+METRICS_TOKEN = os.getenv("METRICS_TOKEN") or None
@@ -0,0 +1,23 @@
+import os
+import tempfile
+
+from django.test import SimpleTestCase, override_settings
+
+from .metrics import registry
+
+
+class MetricsFlushTests(SimpleTestCase):
+    sample = {'total_ms': 5.0, 'db_ms': 1.0, 'queries': 2}
+
+    def test_unwritable_directory_does_not_fail_the_request(self):
+        missing = os.path.join(tempfile.gettempdir(), 'metrics-missing', 'dir')
+        with override_settings(METRICS_MULTIPROC_DIR=missing, METRICS_FLUSH_INTERVAL=0):
+            with self.assertLogs('myFirstApiRest.metrics', 'WARNING'):
+                registry.observe('auction-list-create', 'GET', 200, self.sample)
+                response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+
+    def test_flush_writes_one_file_per_process(self):
+        with tempfile.TemporaryDirectory() as directory:
+            registry.flush(directory)
+            self.assertEqual(os.listdir(directory), [f'metrics-{os.getpid()}.json'])
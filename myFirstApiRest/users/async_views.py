@@ -0,0 +1,29 @@
+from asgiref.sync import sync_to_async
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import APIException
+
+from auctions.async_views import error_response, json_response
+from .authentication import CachedJWTAuthentication
+from .models import CustomUser
+
+
+@require_GET
+async def username_by_id(request, user_id):
+    """Variante asincrona de GetUsernameByIdView (misma autenticacion JWT y respuesta)."""
+    authenticator = CachedJWTAuthentication()
+    try:
+        # Con el usuario en cache no hay consulta, pero si falla hay que ir a la BD
+        credentials = await sync_to_async(authenticator.authenticate)(request)
+    except APIException as exc:
+        response = error_response(exc)
+        response['WWW-Authenticate'] = authenticator.authenticate_header(request)
+        return response
+    if credentials is None or not credentials[0].is_authenticated:
+        response = json_response({'detail': 'Authentication credentials were not provided.'}, status=401)
+        response['WWW-Authenticate'] = authenticator.authenticate_header(request)
+        return response
+
+    username = await CustomUser.objects.filter(id=user_id).values_list('username', flat=True).afirst()
+    if username is None:
+        return json_response({'error': 'User not found'}, status=404)
+    return json_response({'username': username})
@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+USER_VERSION_KEY = 'jwt-user-version:{}'
+USER_KEY = 'jwt-user:{}:{}'
+
+
+def get_user_cache():
+    """
+    Cache compartida por todos los workers, o None. LocMemCache es de cada
+    proceso: la invalidacion solo llegaria al worker que guarda el usuario y en
+    los demas un usuario desactivado o con la contrasena cambiada seguiria
+    autenticado hasta JWT_USER_CACHE_TIMEOUT. Con ella no se cachea.
+    """
+    cache = caches[DEFAULT_CACHE_ALIAS]
+    return None if isinstance(cache, LocMemCache) else cache
+
+
+def user_cache_key(cache, user_id):
+    version = cache.get(USER_VERSION_KEY.format(user_id), 0)
+    return USER_KEY.format(user_id, version)
+
+
+def invalidate_cached_user(user_id):
+    """Invalida el usuario cacheado subiendo su version (las claves antiguas caducan solas)."""
+    cache = get_user_cache()
+    if cache is None:
+        return
+    key = USER_VERSION_KEY.format(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication que guarda el usuario en cache durante poco tiempo
+    (JWT_USER_CACHE_TIMEOUT) para no consultar CustomUser en cada peticion.
+    La cache se invalida tras el commit que guarda o borra el usuario (ver
+    users/signals.py). Solo se usa con una cache compartida (Redis, Memcached...):
+    con la LocMemCache por defecto se comporta como JWTAuthentication.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        cache = get_user_cache()
+        if user_id is None or cache is None:
+            return super().get_user(validated_token)
+
+        key = user_cache_key(cache, user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(key, user, getattr(settings, 'JWT_USER_CACHE_TIMEOUT', 60))
+            return user
+
+        # Las mismas comprobaciones que JWTAuthentication sobre el usuario cacheado
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
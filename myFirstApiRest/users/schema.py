@@ -0,0 +1,7 @@
+"""Extensiones de drf-spectacular para las clases propias de users."""
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    # Mismo esquema de seguridad (jwtAuth, bearer) que JWTAuthentication
+    target_class = 'users.authentication.CachedJWTAuthentication'
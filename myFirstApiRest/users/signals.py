@@ -0,0 +1,16 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .authentication import invalidate_cached_user
+from .models import CustomUser
+
+
+# Perfil editado, contraseña cambiada o usuario borrado: fuera de la cache de JWT.
+# Tras el commit: antes, otra peticion podria volver a cachear la fila antigua y
+# un rollback dejaria la cache invalidada sin motivo
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def user_changed(sender, instance, **kwargs):
+    transaction.on_commit(partial(invalidate_cached_user, instance.pk))
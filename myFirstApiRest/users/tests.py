@@ -1,3 +1,79 @@
-from django.test import TestCase
+import tempfile
+from datetime import date
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase, override_settings
+from drf_spectacular.generators import SchemaGenerator
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import CustomUser
+
+
+class UsernamesQueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = CustomUser.objects.bulk_create([
+            CustomUser(username=f'user-{index}', birth_date=date(1990, 1, 1), password='!')
+            for index in range(30)
+        ])
+
+    def test_usernames_is_a_single_query(self):
+        client = APIClient()
+        client.force_authenticate(self.users[0])
+        ids = ','.join(str(user.pk) for user in self.users)
+        with self.assertNumQueries(1):
+            response = client.get(f'/api/users/usernames/?ids={ids}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {str(user.pk): user.username for user in self.users})
+
+    def test_out_of_range_ids_are_rejected(self):
+        client = APIClient()
+        client.force_authenticate(self.users[0])
+        for ids in ('99999999999999999999999', f'1,{2 ** 63}', '0', '-1'):
+            with self.subTest(ids=ids):
+                self.assertEqual(client.get(f'/api/users/usernames/?ids={ids}').status_code, 400)
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(username='alice', password='pass-1234', birth_date=date(1990, 1, 1))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def profile(self):
+        return self.client.get('/api/users/profile/')
+
+    def test_local_memory_cache_is_not_used(self):
+        # LocMemCache (la de por defecto) no se comparte entre workers
+        self.profile()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.profile().status_code, 200)
+
+    def test_shared_cache_is_invalidated_after_commit(self):
+        backend = 'django.core.cache.backends.filebased.FileBasedCache'
+        with tempfile.TemporaryDirectory() as location, \
+                override_settings(CACHES={'default': {'BACKEND': backend, 'LOCATION': location}}):
+            self.profile()
+            with self.assertNumQueries(0):
+                self.assertEqual(self.profile().status_code, 200)
+
+            with self.captureOnCommitCallbacks() as callbacks:
+                self.user.is_active = False
+                self.user.save()
+            # Sin commit la version no cambia: sigue sirviendose el usuario cacheado
+            self.assertEqual(self.profile().status_code, 200)
+
+            for callback in callbacks:
+                callback()
+            self.assertEqual(self.profile().status_code, 401)
+
+
+class SchemaTests(SimpleTestCase):
+    def test_cached_jwt_authentication_is_documented(self):
+        schema = SchemaGenerator().get_schema(request=None, public=True)
+        self.assertEqual(schema['components']['securitySchemes']['jwtAuth']['scheme'], 'bearer')
+        profile = schema['paths']['/api/users/profile/']['get']
+        self.assertIn({'jwtAuth': []}, profile['security'])
@@ -1,4 +1,5 @@
 from django.urls import path
+from . import async_views
 from .views import (
     UserRegisterView,
     UserListView,
@@ -7,6 +8,7 @@ from .views import (
     UserProfileView,
     ChangePasswordView,
     GetUsernameByIdView,
+    GetUsernamesByIdsView,
 )
 
 app_name = "users"
@@ -16,6 +18,8 @@ urlpatterns = [
     path("<int:pk>/", UserRetrieveUpdateDestroyView.as_view(), name="user-detail"),
     path('profile/', UserProfileView.as_view(), name='user-profile'),
     path('<int:user_id>/username/', GetUsernameByIdView.as_view(), name='get-username-by-id'),
+    path('usernames/', GetUsernamesByIdsView.as_view(), name='get-usernames-by-ids'),
     path('change-password/', ChangePasswordView.as_view(), name='change-password'),
     path("log-out/", LogoutView.as_view(), name="log-out"),
+    path('async/<int:user_id>/username/', async_views.username_by_id, name='async-get-username-by-id'),
 ]
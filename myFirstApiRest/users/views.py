@@ -6,6 +6,7 @@ from django.shortcuts import render
 from rest_framework import status, generics
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
+from auctions.filters import MAX_ID
 from .models import CustomUser
 from .serializers import UserSerializer, ChangePasswordSerializer
 from rest_framework.exceptions import ValidationError
@@ -114,4 +115,27 @@ class GetUsernameByIdView(APIView):
             user = CustomUser.objects.get(id=user_id)
             return Response({"username": user.username}, status=status.HTTP_200_OK)
         except CustomUser.DoesNotExist:
-            return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+            return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
+
+class GetUsernamesByIdsView(APIView):
+    """Resuelve varios ids de una vez: ?ids=1,2,3 -> {"1": "alice", ...} en una sola consulta."""
+    permission_classes = [IsAuthenticated]
+    max_ids = 100
+
+    def get(self, request):
+        raw_ids = [value for value in request.query_params.get("ids", "").split(",") if value.strip()]
+        try:
+            ids = {int(value) for value in raw_ids}
+        except ValueError:
+            return Response({"error": "ids must be a comma-separated list of integers"}, status=status.HTTP_400_BAD_REQUEST)
+        if not ids:
+            return Response({"error": "ids is required"}, status=status.HTTP_400_BAD_REQUEST)
+        # Fuera de rango la BD falla (OverflowError en SQLite, DataError en Postgres)
+        if not all(0 < user_id <= MAX_ID for user_id in ids):
+            return Response({"error": f"ids must be between 1 and {MAX_ID}"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > self.max_ids:
+            return Response({"error": f"At most {self.max_ids} ids per request"}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Los ids que no existen simplemente no aparecen en el resultado
+        usernames = CustomUser.objects.filter(id__in=ids).values_list("id", "username")
+        return Response({str(user_id): username for user_id, username in usernames}, status=status.HTTP_200_OK)